@@ -0,0 +1,82 @@
+# Robust anomaly scores for batches of monthly series.
+#
+# score_series takes a (series x years x 12) array of log values, NaN where a
+# series has no record, and fits every series as a yearly level plus a
+# calendar-month profile (alternating means, so gaps are handled). Fitted
+# residuals are smaller than the noise because each point helped fit its own
+# year and month; dividing by sqrt(1 - leverage) undoes that. The noise scale
+# is a standard deviation over the points within TRIM_MADS robust deviations,
+# and as it is estimated from only a few years of months, each residual over
+# that scale is a Student t value, mapped back to the normal quantile with the
+# same tail probability. On pure noise the share of |z| above a threshold then
+# matches the normal tail.
+
+import warnings
+
+import numpy as np
+from scipy import stats
+
+# Rescales the median absolute deviation to a standard deviation for normal noise
+MAD_SCALE = 1.4826
+
+# Points further than this many robust deviations out are left out of the noise scale
+TRIM_MADS = 3.0
+
+# Variance of a standard normal truncated to +-TRIM_MADS, to keep the trimmed scale consistent
+TRIM_CONSISTENCY = 1 - 2 * TRIM_MADS * stats.norm.pdf(TRIM_MADS) / (2 * stats.norm.cdf(TRIM_MADS) - 1)
+
+# Calendar months seen fewer times than this borrow the fallback series' profile
+MIN_MONTH_SUPPORT = 2
+
+FIT_ITERATIONS = 10
+
+
+# Function to fit year levels and month profiles, returning fitted values and each point's leverage
+def fit_year_month(values, fallback_rows=None, iterations=FIT_ITERATIONS):
+    observed = ~np.isnan(values)
+    fallback_rows = np.arange(len(values)) if fallback_rows is None else np.asarray(fallback_rows)
+
+    year_counts = observed.sum(axis=2, keepdims=True)
+    month_counts = observed.sum(axis=1)
+    own_profile = month_counts >= MIN_MONTH_SUPPORT
+    total_counts = observed.sum(axis=(1, 2))
+
+    level = np.zeros(values.shape[:2] + (1,))
+    profile = np.zeros((len(values), 12))
+    for _ in range(iterations):
+        profile = np.nanmean(values - level, axis=1)
+        profile = np.where(own_profile, profile, profile[fallback_rows])
+        profile = np.nan_to_num(profile)
+        level = np.nanmean(values - profile[:, None, :], axis=2, keepdims=True)
+
+    fitted = level + profile[:, None, :]
+
+    # Additive-fit leverage 1/n_year + 1/n_month - 1/n (borrowed profiles cost no leverage)
+    with np.errstate(divide='ignore'):
+        leverage = 1 / year_counts + np.where(own_profile, 1 / month_counts - 1 / total_counts[:, None], 0)[:, None, :]
+    return fitted, np.where(observed, leverage, np.nan)
+
+
+# Function to score every point of every series with a robust z-score (NaN where it cannot be scored)
+def score_series(values, fallback_rows=None):
+    with warnings.catch_warnings():
+        # All-NaN slices are expected for sparse series
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        fitted, leverage = fit_year_month(values, fallback_rows)
+        # A point that alone fixes its year or month level has no residual to score
+        scorable = leverage < 1 - 1e-9
+        residuals = np.where(scorable, (values - fitted) / np.sqrt(np.where(scorable, 1 - leverage, 1)), np.nan)
+
+        mad = MAD_SCALE * np.nanmedian(np.abs(residuals), axis=(1, 2), keepdims=True)
+        inliers = np.abs(residuals) <= TRIM_MADS * mad
+        kept = inliers.sum(axis=(1, 2), keepdims=True)
+        scale = np.sqrt(np.sum(np.where(inliers, residuals ** 2, 0), axis=(1, 2), keepdims=True) / (kept * TRIM_CONSISTENCY))
+
+        # Degrees of freedom: kept points less the fitted parameters (the trace of the hat matrix)
+        dof = kept - np.nansum(leverage, axis=(1, 2), keepdims=True)
+        t = np.where((scale > 1e-9) & (dof >= 1), residuals / scale, np.nan)
+        tail = stats.t.sf(np.abs(t), np.maximum(dof, 1))
+        scores = np.sign(t) * stats.norm.isf(np.maximum(tail, 1e-300))
+
+    return scores, fitted
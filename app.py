@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import snowflake.connector
 import json
 from PIL import Image
@@ -11,6 +12,18 @@ import requests
 import random
 import matplotlib.pyplot as plt
 import base64
+import time
+from anomalies import score_series
+from chunked_aggregation import aggregate_chunks, aggregate_file, file_version, iter_budget_chunks
+from filter_cells import (CUBE_MEASURES, build_cube, filter_rows, maintain_filter_aggregates,
+                          selected_filter_cells, sum_cells)
+from geo_index import HeritageSiteIndex
+from geometry import prepare_static_geometry
+from refresh_worker import RefreshWorker
+from seasonality import decompose_series
+from summary_engine import count_distinct, summarize_totals, top_k
+from tourism_model import (ART_FORMS, POPULARITY_FACTOR, SEASONAL_MULTIPLIERS, STATE_TO_REGION, STATES, YEARLY_GROWTH,
+                           art_form_kind)
 
 # Set page config
 st.set_page_config(
@@ -57,121 +70,95 @@ st.markdown("""
         font-size: 1rem;
         color: #6c757d;
     }
+    .metric-error {
+        font-size: 0.8rem;
+        color: #868e96;
+    }
 </style>
 """, unsafe_allow_html=True)
 
+# Warehouse connector: SNOWFLAKE_CONNECTOR=local swaps in the offline stand-in (local_snowflake.py)
+if os.environ.get('SNOWFLAKE_CONNECTOR') == 'local':
+    import local_snowflake as warehouse_connector
+else:
+    warehouse_connector = snowflake.connector
+
+# With SNOWFLAKE_STRICT=1 warehouse failures are raised instead of falling back to mock data
+STRICT_WAREHOUSE = os.environ.get('SNOWFLAKE_STRICT') == '1'
+
+# Out-of-core mode (OUT_OF_CORE=1) streams fact tables in chunks and keeps only aggregates at the
+# dashboard grain, within MEMORY_BUDGET_MB; FACT_TABLE_PATH adds a local CSV/Parquet fact source
+OUT_OF_CORE = os.environ.get('OUT_OF_CORE') == '1'
+FACT_TABLE_PATH = os.environ.get('FACT_TABLE_PATH')
+
+# Function to read warehouse credentials from the environment (used by the background refresh)
+def warehouse_credentials_from_env():
+    return {
+        'snowflake_user': os.environ.get('SNOWFLAKE_USER', ''),
+        'snowflake_password': os.environ.get('SNOWFLAKE_PASSWORD', ''),
+        'snowflake_account': os.environ.get('SNOWFLAKE_ACCOUNT', ''),
+        'snowflake_warehouse': os.environ.get('SNOWFLAKE_WAREHOUSE', 'COMPUTE_WH'),
+        'snowflake_database': os.environ.get('SNOWFLAKE_DATABASE', ''),
+        'snowflake_schema': os.environ.get('SNOWFLAKE_SCHEMA', 'PUBLIC')
+    }
+
 # Function to connect to Snowflake
-def connect_to_snowflake():
+def connect_to_snowflake(credentials=None, strict=STRICT_WAREHOUSE):
+    # Credentials come from the session unless given explicitly (e.g. outside a script run)
+    credentials = st.session_state if credentials is None else credentials
     try:
         # In a real application, store these securely using st.secrets
-        conn = snowflake.connector.connect(
-            user=st.session_state.get('snowflake_user', 'somdevsheel'),
-            password=st.session_state.get('snowflake_password', 'hh'),
-            account=st.session_state.get('snowflake_account', 'LO64709'),
-            warehouse=st.session_state.get('snowflake_warehouse', 'COMPUTE_WH'),
-            database=st.session_state.get('snowflake_database', 'SNOWFLAKE_SAMPLE_DATA'),
-            schema=st.session_state.get('snowflake_schema', 'PUBLIC')
+        conn = warehouse_connector.connect(
+            user=credentials.get('snowflake_user', 'somdevsheel'),
+            password=credentials.get('snowflake_password', 'hh'),
+            account=credentials.get('snowflake_account', 'LO64709'),
+            warehouse=credentials.get('snowflake_warehouse', 'COMPUTE_WH'),
+            database=credentials.get('snowflake_database', 'SNOWFLAKE_SAMPLE_DATA'),
+            schema=credentials.get('snowflake_schema', 'PUBLIC')
         )
         return conn
     except Exception as e:
+        if strict:
+            raise
         st.error(f"Failed to connect to Snowflake: {str(e)}")
         return None
 
+# Latitude and longitude for each state (approximate centers)
+STATE_COORDINATES = {
+    'Andhra Pradesh': (15.9129, 79.7400),
+    'Arunachal Pradesh': (28.2180, 94.7278),
+    'Assam': (26.2006, 92.9376),
+    'Bihar': (25.0961, 85.3131),
+    'Chhattisgarh': (21.2787, 81.8661),
+    'Goa': (15.2993, 74.1240),
+    'Gujarat': (22.2587, 71.1924),
+    'Haryana': (29.0588, 76.0856),
+    'Himachal Pradesh': (31.1048, 77.1734),
+    'Jharkhand': (23.6102, 85.2799),
+    'Karnataka': (15.3173, 75.7139),
+    'Kerala': (10.8505, 76.2711),
+    'Madhya Pradesh': (23.4733, 77.9470),
+    'Maharashtra': (19.7515, 75.7139),
+    'Manipur': (24.6637, 93.9063),
+    'Meghalaya': (25.4670, 91.3662),
+    'Mizoram': (23.1645, 92.9376),
+    'Nagaland': (26.1584, 94.5624),
+    'Odisha': (20.9517, 85.0985),
+    'Punjab': (31.1471, 75.3412),
+    'Rajasthan': (27.0238, 74.2179),
+    'Sikkim': (27.5330, 88.5122),
+    'Tamil Nadu': (11.1271, 78.6569),
+    'Telangana': (18.1124, 79.0193),
+    'Tripura': (23.9408, 91.9882),
+    'Uttar Pradesh': (26.8467, 80.9462),
+    'Uttarakhand': (30.0668, 79.0193),
+    'West Bengal': (22.9868, 87.8550),
+    'Delhi': (28.7041, 77.1025),
+    'Jammu and Kashmir': (33.7782, 76.5762)
+}
+
 # Function to generate mock data
 def generate_mock_data():
-    # Indian states and union territories
-    states = [
-        'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh',
-        'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand', 'Karnataka',
-        'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya', 'Mizoram',
-        'Nagaland', 'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana',
-        'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal', 'Delhi', 'Jammu and Kashmir'
-    ]
-    
-    # Define regions for each state
-    regions = {
-        'North': ['Delhi', 'Haryana', 'Himachal Pradesh', 'Jammu and Kashmir', 'Punjab', 'Rajasthan', 'Uttar Pradesh', 'Uttarakhand'],
-        'South': ['Andhra Pradesh', 'Karnataka', 'Kerala', 'Tamil Nadu', 'Telangana'],
-        'East': ['Bihar', 'Jharkhand', 'Odisha', 'West Bengal'],
-        'West': ['Goa', 'Gujarat', 'Maharashtra'],
-        'Central': ['Chhattisgarh', 'Madhya Pradesh'],
-        'Northeast': ['Arunachal Pradesh', 'Assam', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Sikkim', 'Tripura']
-    }
-    
-    # Map states to their regions
-    state_to_region = {}
-    for region, region_states in regions.items():
-        for state in region_states:
-            state_to_region[state] = region
-    
-    # Traditional art forms by state
-    art_forms = {
-        'Andhra Pradesh': ['Kuchipudi', 'Kalamkari', 'Budithi Brass Craft'],
-        'Arunachal Pradesh': ['Monpa Mask', 'Thangka Paintings', 'Wancho Wood Carving'],
-        'Assam': ['Bihu Dance', 'Sattriya Dance', 'Assam Silk Weaving'],
-        'Bihar': ['Madhubani Painting', 'Manjusha Art', 'Sujni Embroidery'],
-        'Chhattisgarh': ['Panthi Dance', 'Godna Art', 'Bell Metal Craft'],
-        'Goa': ['Dekni Dance', 'Fugdi Dance', 'Goan Lacework'],
-        'Gujarat': ['Garba', 'Patola Weaving', 'Rogan Art'],
-        'Haryana': ['Phag Dance', 'Embroidery Craft', 'Charpai Weaving'],
-        'Himachal Pradesh': ['Kullu Shawl Weaving', 'Chamba Rumal', 'Kangra Painting'],
-        'Jharkhand': ['Sohrai Painting', 'Chhau Dance', 'Dokra Metal Craft'],
-        'Karnataka': ['Yakshagana', 'Bidri Ware', 'Mysore Painting'],
-        'Kerala': ['Kathakali', 'Mohiniyattam', 'Aranmula Kannadi'],
-        'Madhya Pradesh': ['Gond Art', 'Bagh Print', 'Chanderi Weaving'],
-        'Maharashtra': ['Lavani Dance', 'Warli Painting', 'Paithani Sarees'],
-        'Manipur': ['Manipuri Dance', 'Longpi Pottery', 'Phanek Weaving'],
-        'Meghalaya': ['Nongkrem Dance', 'Bamboo Craft', 'Garo Wangala Dance'],
-        'Mizoram': ['Cheraw Dance', 'Mizo Bamboo Dance', 'Puanchei Textiles'],
-        'Nagaland': ['Hornbill Festival Dances', 'Naga Shawl Weaving', 'Wood Carving'],
-        'Odisha': ['Odissi Dance', 'Pattachitra', 'Applique Work'],
-        'Punjab': ['Bhangra', 'Phulkari Embroidery', 'Jutti Making'],
-        'Rajasthan': ['Ghoomar Dance', 'Blue Pottery', 'Miniature Painting'],
-        'Sikkim': ['Mask Dance', 'Thangka Painting', 'Carpet Weaving'],
-        'Tamil Nadu': ['Bharatanatyam', 'Tanjore Painting', 'Stone Carving'],
-        'Telangana': ['Perini Shivatandavam', 'Nirmal Paintings', 'Bidri Craft'],
-        'Tripura': ['Hojagiri Dance', 'Bamboo Craft', 'Risa Textile Weaving'],
-        'Uttar Pradesh': ['Kathak Dance', 'Chikankari', 'Lucknow Zardozi'],
-        'Uttarakhand': ['Choliya Dance', 'Aipan Art', 'Ringal Craft'],
-        'West Bengal': ['Durga Puja Art', 'Kantha Stitch', 'Patachitra'],
-        'Delhi': ['Kathak Dance', 'Zardozi Work', 'Meenakari Craft'],
-        'Jammu and Kashmir': ['Rauf Dance', 'Pashmina Weaving', 'Walnut Wood Carving']
-    }
-    
-    # Latitude and longitude for each state (approximate centers)
-    state_coordinates = {
-        'Andhra Pradesh': (15.9129, 79.7400),
-        'Arunachal Pradesh': (28.2180, 94.7278),
-        'Assam': (26.2006, 92.9376),
-        'Bihar': (25.0961, 85.3131),
-        'Chhattisgarh': (21.2787, 81.8661),
-        'Goa': (15.2993, 74.1240),
-        'Gujarat': (22.2587, 71.1924),
-        'Haryana': (29.0588, 76.0856),
-        'Himachal Pradesh': (31.1048, 77.1734),
-        'Jharkhand': (23.6102, 85.2799),
-        'Karnataka': (15.3173, 75.7139),
-        'Kerala': (10.8505, 76.2711),
-        'Madhya Pradesh': (23.4733, 77.9470),
-        'Maharashtra': (19.7515, 75.7139),
-        'Manipur': (24.6637, 93.9063),
-        'Meghalaya': (25.4670, 91.3662),
-        'Mizoram': (23.1645, 92.9376),
-        'Nagaland': (26.1584, 94.5624),
-        'Odisha': (20.9517, 85.0985),
-        'Punjab': (31.1471, 75.3412),
-        'Rajasthan': (27.0238, 74.2179),
-        'Sikkim': (27.5330, 88.5122),
-        'Tamil Nadu': (11.1271, 78.6569),
-        'Telangana': (18.1124, 79.0193),
-        'Tripura': (23.9408, 91.9882),
-        'Uttar Pradesh': (26.8467, 80.9462),
-        'Uttarakhand': (30.0668, 79.0193),
-        'West Bengal': (22.9868, 87.8550),
-        'Delhi': (28.7041, 77.1025),
-        'Jammu and Kashmir': (33.7782, 76.5762)
-    }
-    
     # Create empty list to store data
     data = []
     
@@ -179,54 +166,21 @@ def generate_mock_data():
     years = range(2020, 2025)
     months = range(1, 13)
     
-    # Seasonal trends - higher tourism in different regions based on season
-    # Higher tourism in North and Central during winter (Nov-Feb)
-    # Higher tourism in Himalayan regions during summer (Apr-Jul)
-    # Higher tourism in South and East during monsoon (Jul-Oct)
-    seasonal_multipliers = {
-        'North': [0.8, 0.7, 0.9, 1.0, 1.1, 1.2, 0.7, 0.6, 0.8, 1.0, 1.5, 1.7],
-        'South': [1.3, 1.2, 1.0, 0.8, 0.7, 0.6, 0.8, 1.0, 1.2, 1.4, 1.3, 1.5],
-        'East': [1.2, 1.0, 0.9, 0.8, 0.7, 0.6, 0.9, 1.1, 1.3, 1.4, 1.2, 1.3],
-        'West': [1.1, 1.0, 0.9, 0.7, 0.6, 0.5, 0.8, 1.2, 1.4, 1.3, 1.2, 1.3],
-        'Central': [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.5],
-        'Northeast': [0.6, 0.7, 0.9, 1.1, 1.3, 1.4, 0.9, 0.7, 0.8, 1.0, 0.8, 0.7]
-    }
-    
-    # Year-on-year growth trend (tourism recovery after COVID)
-    yearly_growth = {
-        2020: 0.4,  # COVID impact
-        2021: 0.6,  # Partial recovery
-        2022: 0.8,  # Further recovery
-        2023: 0.9,  # Almost back to normal
-        2024: 1.1   # Beyond pre-COVID levels
-    }
-    
-    # Base popularity factors for states (larger states/popular tourist destinations have higher base visitors)
-    popularity_factor = {
-        'Rajasthan': 1.8, 'Kerala': 1.7, 'Goa': 1.6, 'Tamil Nadu': 1.7, 'Uttar Pradesh': 1.7,
-        'Maharashtra': 1.6, 'Delhi': 1.6, 'Gujarat': 1.4, 'Karnataka': 1.5, 'Himachal Pradesh': 1.4,
-        'Uttarakhand': 1.4, 'Jammu and Kashmir': 1.3, 'West Bengal': 1.4, 'Madhya Pradesh': 1.3,
-        'Odisha': 1.2, 'Andhra Pradesh': 1.2, 'Telangana': 1.2, 'Assam': 1.1, 'Punjab': 1.1,
-        'Bihar': 0.9, 'Chhattisgarh': 0.9, 'Jharkhand': 0.8, 'Manipur': 0.8, 'Meghalaya': 0.9,
-        'Tripura': 0.8, 'Nagaland': 0.8, 'Mizoram': 0.7, 'Sikkim': 1.0, 'Arunachal Pradesh': 0.9,
-        'Haryana': 0.9
-    }
-    
     for year in years:
         for month in months:
-            for state in states:
-                region = state_to_region.get(state, 'Other')
-                state_pop_factor = popularity_factor.get(state, 1.0)
-                seasonal_factor = seasonal_multipliers.get(region, [1.0] * 12)[month - 1]
-                year_factor = yearly_growth.get(year, 1.0)
+            for state in STATES:
+                region = STATE_TO_REGION.get(state, 'Other')
+                state_pop_factor = POPULARITY_FACTOR.get(state, 1.0)
+                seasonal_factor = SEASONAL_MULTIPLIERS.get(region, [1.0] * 12)[month - 1]
+                year_factor = YEARLY_GROWTH.get(year, 1.0)
                 
                 # Generate tourist visits with some randomness and factors
                 base_visits = np.random.gamma(shape=10, scale=state_pop_factor * 10000)
                 tourist_visits = int(base_visits * seasonal_factor * year_factor * (1 + np.random.normal(0, 0.1)))
                 
                 # Random art form selection for this record
-                if state in art_forms:
-                    art_form = random.choice(art_forms[state])
+                if state in ART_FORMS:
+                    art_form = random.choice(ART_FORMS[state])
                 else:
                     art_form = "Traditional Dance"
                 
@@ -235,7 +189,7 @@ def generate_mock_data():
                 funding_received = int(funding_base * (1 + np.random.normal(0, 0.2)))
                 
                 # Get coordinates
-                lat, lon = state_coordinates.get(state, (0, 0))
+                lat, lon = STATE_COORDINATES.get(state, (0, 0))
                 
                 # Append data
                 data.append({
@@ -252,40 +206,932 @@ def generate_mock_data():
     
     return pd.DataFrame(data)
 
+# Function to add state coordinates to facts loaded from storage (they are not stored there)
+def add_state_coordinates(df):
+    df['latitude'] = df['state'].map(lambda state: STATE_COORDINATES.get(state, (0, 0))[0])
+    df['longitude'] = df['state'].map(lambda state: STATE_COORDINATES.get(state, (0, 0))[1])
+    return df
+
 # Function to query data from Snowflake
-def query_snowflake_data():
+def query_snowflake_data(credentials=None, strict=STRICT_WAREHOUSE):
     try:
-        conn = connect_to_snowflake()
+        conn = connect_to_snowflake(credentials, strict)
         if conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT state, art_form, tourist_visits, month, year, region, funding_received 
-                FROM tourism_data
-            """)
-            
-            # Fetch result into a pandas dataframe
-            result = cursor.fetch_pandas_all()
+            if OUT_OF_CORE:
+                # The warehouse sums to the dashboard grain; its batches are re-sliced to the memory budget
+                cursor.execute("""
+                    SELECT year, month, region, state, art_form,
+                           SUM(tourist_visits) AS tourist_visits, SUM(funding_received) AS funding_received
+                    FROM tourism_data
+                    GROUP BY year, month, region, state, art_form
+                """)
+                result = aggregate_chunks(iter_budget_chunks(cursor.fetch_pandas_batches()))
+            else:
+                cursor.execute("""
+                    SELECT state, art_form, tourist_visits, month, year, region, funding_received 
+                    FROM tourism_data
+                """)
+                
+                # Fetch result into a pandas dataframe
+                result = cursor.fetch_pandas_all()
             
             # Close connection
             cursor.close()
             conn.close()
             
-            return result
+            # Snowflake returns upper-case column names
+            result.columns = [column.lower() for column in result.columns]
+            return add_state_coordinates(result)
         else:
             # If connection fails, use mock data
             return generate_mock_data()
     except Exception as e:
+        if strict:
+            raise
         st.warning(f"Using mock data (Error: {str(e)})")
         return generate_mock_data()
 
+# Function to query daily facts from Snowflake (None when unavailable)
+def query_snowflake_daily_data(credentials=None):
+    try:
+        conn = connect_to_snowflake(credentials)
+        if conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT visit_date, state, region,
+                       SUM(tourist_visits) AS tourist_visits, SUM(funding_received) AS funding_received
+                FROM tourism_daily
+                GROUP BY visit_date, state, region
+            """)
+
+            result = cursor.fetch_pandas_all()
+
+            cursor.close()
+            conn.close()
+
+            # Snowflake returns upper-case column names
+            result.columns = [column.lower() for column in result.columns]
+            result = result.rename(columns={'visit_date': 'date'})
+            result['date'] = pd.to_datetime(result['date'])
+            result['year'] = result['date'].dt.year
+            result['month'] = result['date'].dt.month
+            return result
+        return None
+    except Exception as e:
+        st.warning(f"Deriving daily data from monthly totals (Error: {str(e)})")
+        return None
+
+# State boundaries for the choropleth (GeoJSON path or URL) and the property holding the state name
+STATE_GEOJSON_SOURCE = os.environ.get('INDIA_STATES_GEOJSON', os.path.join('data', 'india_states.geojson'))
+STATE_GEOJSON_ID_PROPERTY = os.environ.get('INDIA_STATES_GEOJSON_ID', 'ST_NM')
+
+# Boundary datasets often use older or alternative state names
+STATE_NAME_ALIASES = {
+    'Jammu & Kashmir': 'Jammu and Kashmir',
+    'NCT of Delhi': 'Delhi',
+    'Orissa': 'Odisha',
+    'Uttaranchal': 'Uttarakhand',
+    'Andaman & Nicobar Island': 'Andaman and Nicobar Islands',
+    'Dadara & Nagar Havelli': 'Dadra and Nagar Haveli'
+}
+
+# Prepare the simplified boundary files once per process; None when no source is available
+@st.cache_resource(show_spinner=False)
+def load_state_geometry_urls():
+    is_url = STATE_GEOJSON_SOURCE.startswith(('http://', 'https://'))
+    if not is_url and not os.path.exists(STATE_GEOJSON_SOURCE):
+        return None
+    try:
+        # Streamlit serves ./static next to the main script
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        return prepare_static_geometry(STATE_GEOJSON_SOURCE, STATE_GEOJSON_ID_PROPERTY, rename=STATE_NAME_ALIASES,
+                                       cache_dir=os.path.join(app_dir, '.cache', 'geometry'),
+                                       static_dir=os.path.join(app_dir, 'static', 'geo'))
+    except Exception as e:
+        st.warning(f"State boundaries unavailable (Error: {str(e)})")
+        return None
+
+# Kinds of heritage sites in the mock site layer
+HERITAGE_SITE_CATEGORIES = ['Monument', 'Temple', 'Fort', 'Museum', 'Craft Village', 'Performing Arts Centre']
+
+# Function to generate mock heritage sites scattered around each state's centre
+def generate_mock_heritage_sites(n_sites=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    states = np.array(list(STATE_COORDINATES.keys()))
+    centres = np.array(list(STATE_COORDINATES.values()))
+
+    state_idx = rng.integers(0, len(states), n_sites)
+    offsets = rng.normal(0, 1.0, (n_sites, 2))
+
+    sites = pd.DataFrame({
+        'site_id': np.arange(n_sites),
+        'state': states[state_idx],
+        'category': rng.choice(HERITAGE_SITE_CATEGORIES, n_sites),
+        'latitude': centres[state_idx, 0] + offsets[:, 0],
+        'longitude': centres[state_idx, 1] + offsets[:, 1]
+    })
+    sites['name'] = sites['state'] + ' ' + sites['category'] + ' #' + sites['site_id'].astype(str)
+    return sites
+
+# Build the heritage-site spatial index once per process
+@st.cache_resource(show_spinner=False)
+def load_heritage_site_index():
+    return HeritageSiteIndex(generate_mock_heritage_sites())
+
+# Datasets kept per fingerprint-keyed cache, so older snapshots are evicted after a refresh
+SNAPSHOT_CACHE_ENTRIES = 4
+
+# Cache the mock dataset so reruns (and caches keyed on it) see the same table
+@st.cache_data(show_spinner=False)
+def load_mock_data():
+    return generate_mock_data()
+
+# Load a local fact file once per file version, aggregated out of core when enabled
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def load_fact_file(path, version):
+    if OUT_OF_CORE:
+        df = aggregate_file(path)
+    else:
+        df = pd.read_csv(path) if path.endswith('.csv') else pd.read_parquet(path)
+        df.columns = [column.lower() for column in df.columns]
+        # Partition keys and dictionary-encoded columns are read back as categoricals
+        df[['year', 'month']] = df[['year', 'month']].astype('int64')
+        for column in ['state', 'art_form', 'region']:
+            df[column] = df[column].astype(str)
+    return add_state_coordinates(df)
+
+# Function to compute a cheap fingerprint identifying a dataset
+def dataset_fingerprint(df):
+    # Hash a strided slice of rows plus a couple of full-column totals
+    step = max(len(df) // 10000, 1)
+    row_hash = int(pd.util.hash_pandas_object(df.iloc[::step], index=False).sum())
+    return f"{len(df)}-{int(df['tourist_visits'].sum())}-{row_hash:x}"
+
+# Approximate preview settings
+PREVIEW_SAMPLE_FRACTION = 0.01
+PREVIEW_MIN_SAMPLE_ROWS = 10000  # smaller tables are previewed from every row
+PREVIEW_MAX_SAMPLE_ROWS = 200000  # keeps the per-rerun estimate cheap on very large tables
+PREVIEW_COLUMNS = ['year', 'region', 'state', 'month', 'art_form', 'tourist_visits', 'funding_received']
+PREVIEW_Z = 1.96  # 95% confidence
+
+# Function to draw a simple random sample of rows for the fast preview
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def build_preview_sample(_df, fingerprint, fraction=PREVIEW_SAMPLE_FRACTION):
+    rng = np.random.default_rng(0)
+
+    # Only the sampled positions are touched: no pass over the full table
+    population = len(_df)
+    n_sample = min(population, max(PREVIEW_MIN_SAMPLE_ROWS, min(int(population * fraction), PREVIEW_MAX_SAMPLE_ROWS)))
+    positions = np.sort(rng.choice(population, n_sample, replace=False))
+    sample = _df.iloc[positions]
+
+    return {
+        'sample': sample[PREVIEW_COLUMNS].reset_index(drop=True),
+        'population': population,
+        # Coordinates per state for the map (states missing from the sample estimate to zero anyway)
+        'locations': sample.groupby('state')[['latitude', 'longitude']].first().reset_index()
+    }
+
+# Function to estimate the overview aggregates for the current filters from the preview sample
+def estimate_preview_aggregates(preview, selected_year, selected_region, selected_months):
+    sample = preview['sample']
+    population, n_sample = preview['population'], len(sample)
+    selected = sample[(sample['year'] == selected_year) &
+                      (sample['region'].isin(selected_region)) &
+                      (sample['month'].isin(selected_months))]
+
+    # Expansion estimator for a domain total under simple random sampling:
+    # N/n * sum(y), variance N^2 * (1 - n/N) / n * s^2 over all n sampled rows (zero outside the domain)
+    scale = population / n_sample
+    variance_factor = population ** 2 * (1 - n_sample / population) / n_sample
+
+    def domain_variance(total, total_sq):
+        if n_sample < 2:
+            return total * 0
+        return variance_factor * (total_sq - total ** 2 / n_sample) / (n_sample - 1)
+
+    measures = selected[['state', 'tourist_visits', 'funding_received']].assign(
+        visits_sq=selected['tourist_visits'].astype(float) ** 2,
+        funding_sq=selected['funding_received'].astype(float) ** 2
+    )
+    sums = measures.groupby('state').sum()
+    state_agg = pd.DataFrame({
+        'state': sums.index,
+        'tourist_visits': sums['tourist_visits'].to_numpy() * scale,
+        'funding_received': sums['funding_received'].to_numpy() * scale,
+        'visits_moe': PREVIEW_Z * np.sqrt(domain_variance(sums['tourist_visits'].to_numpy(), sums['visits_sq'].to_numpy()))
+    })
+    state_agg = state_agg[state_agg['tourist_visits'] > 0].reset_index(drop=True)
+
+    totals = measures.drop(columns='state').sum()
+    return {
+        'total_visits': totals['tourist_visits'] * scale,
+        'visits_moe': PREVIEW_Z * np.sqrt(domain_variance(totals['tourist_visits'], totals['visits_sq'])),
+        'total_funding': totals['funding_received'] * scale,
+        'funding_moe': PREVIEW_Z * np.sqrt(domain_variance(totals['funding_received'], totals['funding_sq'])),
+        'n_states': len(state_agg),
+        'n_art_forms': count_distinct(selected['art_form']),
+        'top_states': state_agg.iloc[top_k(state_agg['tourist_visits'].to_numpy())],
+        'state_agg': state_agg[['state', 'tourist_visits', 'funding_received', 'visits_moe']],
+        'map_data': state_agg[['state', 'tourist_visits', 'visits_moe']].merge(preview['locations'], on='state')
+    }
+
+# Fingerprints whose filter cube is already built (shared by all sessions, trimmed like the cube cache)
+@st.cache_resource(show_spinner=False)
+def built_filter_cubes():
+    return {}
+
+# Function to precompute partial aggregates for every (year, region, month) filter cell
+@st.cache_resource(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def build_filter_cube(_df, fingerprint):
+    cube = build_cube(_df)
+    built = built_filter_cubes()
+    built[fingerprint] = True
+    while len(built) > SNAPSHOT_CACHE_ENTRIES:
+        built.pop(next(iter(built)), None)
+    return cube
+
+# Function to turn (member x measure) totals into an aggregate table
+def totals_to_frame(totals, members, dimension):
+    present = totals[:, 2] > 0
+    return pd.DataFrame({
+        dimension: members[present],
+        'tourist_visits': totals[present, 0],
+        'funding_received': totals[present, 1]
+    })
+
+# Function to compute the exact overview aggregates from the maintained totals
+def compute_exact_aggregates(cube, aggregates):
+    state_agg = totals_to_frame(aggregates['state_totals'], cube['states'], 'state')
+    art_form_agg = totals_to_frame(aggregates['art_form_totals'], cube['art_forms'], 'art_form')
+
+    # Totals, distinct counts and top-10 leaderboards in one pass over each dimension's totals
+    states = summarize_totals(aggregates['state_totals'], cube['states'], CUBE_MEASURES, 'state')
+    art_forms = summarize_totals(aggregates['art_form_totals'], cube['art_forms'], CUBE_MEASURES, 'art_form')
+
+    return {
+        'total_visits': states['totals']['tourist_visits'],
+        'total_funding': states['totals']['funding_received'],
+        'n_states': states['distinct'],
+        'n_art_forms': art_forms['distinct'],
+        'top_states': states['top'],
+        'top_art_forms': art_forms['top'],
+        'state_agg': state_agg,
+        'art_form_agg': art_form_agg,
+        'map_data': state_agg[['state', 'tourist_visits']].merge(cube['locations'], on='state')
+    }
+
+# Chart rendering budgets
+WEBGL_POINT_THRESHOLD = 1000  # scatter/line traces with more points are drawn with WebGL
+CHART_POINT_BUDGET = 2000  # points per chart after downsampling line traces
+PAGE_PAYLOAD_BUDGET = 8 * 1024 * 1024  # bytes of figure JSON sent per page run
+MIN_TRACE_POINTS = 100
+
+# Figure bytes sent so far in this run (the script re-executes, so this resets every rerun),
+# and the bytes currently shown in each placeholder, which a re-render replaces
+page_payload = {'bytes': 0, 'placeholders': {}}
+
+# Function to pick indices with Largest-Triangle-Three-Buckets downsampling
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[selected] - avg_x) * (y[start:end] - y[selected]) -
+                      (x[selected] - x[start:end]) * (avg_y - y[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+
+    return indices
+
+# Function to convert trace x values to numbers for downsampling
+def numeric_axis(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(float)
+    try:
+        return pd.to_datetime(values).to_numpy().astype(np.int64).astype(float)
+    except (ValueError, TypeError):
+        return np.arange(len(values), dtype=float)
+
+# Function to keep only the given points of a scatter/line trace
+def subset_trace(trace, indices):
+    n = len(trace.y)
+    for name in ['x', 'y', 'customdata', 'text', 'hovertext', 'ids']:
+        values = trace[name]
+        if values is not None and not isinstance(values, str) and len(values) == n:
+            trace[name] = np.asarray(values)[indices]
+    for name in ['size', 'color', 'symbol']:
+        values = trace.marker[name]
+        if values is not None and not isinstance(values, str) and np.ndim(values) == 1 and len(values) == n:
+            trace.marker[name] = np.asarray(values)[indices]
+
+# Function to downsample long line traces and switch large scatter/line traces to WebGL
+def optimize_figure(fig, point_budget=CHART_POINT_BUDGET, webgl_threshold=WEBGL_POINT_THRESHOLD):
+    line_traces = {id(trace) for trace in fig.data
+                   if trace.type in ('scatter', 'scattergl') and trace.y is not None and 'lines' in (trace.mode or 'lines')}
+    trace_budget = max(point_budget // max(len(line_traces), 1), MIN_TRACE_POINTS)
+
+    traces = []
+    changed = False
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or trace.y is None:
+            traces.append(trace)
+            continue
+
+        if id(trace) in line_traces and len(trace.y) > trace_budget:
+            x = numeric_axis(trace.x if trace.x is not None else np.arange(len(trace.y)))
+            y = np.nan_to_num(np.asarray(trace.y, dtype=float))
+            subset_trace(trace, lttb_indices(x, y, trace_budget))
+            changed = True
+
+        if trace.type == 'scatter' and len(trace.y) > webgl_threshold:
+            properties = trace.to_plotly_json()
+            properties.pop('type', None)
+            trace = go.Scattergl(properties, skip_invalid=True)
+            changed = True
+
+        traces.append(trace)
+
+    if not changed:
+        return fig
+    return go.Figure(data=traces, layout=fig.layout)
+
+# Function to render a chart within the per-chart point budget and per-page payload budget
+def show_chart(fig, container=None, point_budget=CHART_POINT_BUDGET, **kwargs):
+    # Re-rendering a placeholder (e.g. exact charts after the fast preview) frees what it showed before
+    placeholder = id(container) if container is not None else None
+    replaced = page_payload['placeholders'].pop(placeholder, 0)
+    page_payload['bytes'] -= replaced
+
+    container = container or st
+    fig = optimize_figure(fig, point_budget)
+    payload = len(fig.to_json())
+
+    # Tighten the point budget until the chart fits in what is left of the page budget
+    while page_payload['bytes'] + payload > PAGE_PAYLOAD_BUDGET and point_budget > MIN_TRACE_POINTS:
+        point_budget //= 2
+        fig = optimize_figure(fig, point_budget)
+        payload = len(fig.to_json())
+
+    if page_payload['bytes'] + payload > PAGE_PAYLOAD_BUDGET:
+        container.info("Chart skipped to keep this page within its data budget. Narrow the filters to see it.")
+        return None
+
+    page_payload['bytes'] += payload
+    if placeholder is not None:
+        page_payload['placeholders'][placeholder] = payload
+    return container.plotly_chart(fig, use_container_width=True, **kwargs)
+
+# Function to format a margin of error as a percentage of its estimate
+def format_moe(moe, value):
+    if not value:
+        return ""
+    return f"± {moe / value * 100:.1f}% (95% CI)"
+
+# Function to render the KPI cards, map and top-10 chart into their placeholders
+def render_overview(summary, kpi_placeholder, map_placeholder, top_states_placeholder, approximate=False,
+                    geometry_url=None):
+    prefix = "≈ " if approximate else ""
+    visits_note = format_moe(summary['visits_moe'], summary['total_visits']) if approximate else ""
+    funding_note = format_moe(summary['funding_moe'], summary['total_funding']) if approximate else ""
+    art_forms_prefix = "≥ " if approximate else ""
+
+    with kpi_placeholder.container():
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.markdown("""
+            <div class="metric-card">
+                <div class="metric-value">{}{:,}</div>
+                <div class="metric-label">Total Tourist Visits</div>
+                <div class="metric-error">{}</div>
+            </div>
+            """.format(prefix, int(summary['total_visits']), visits_note), unsafe_allow_html=True)
+
+        with col2:
+            st.markdown("""
+            <div class="metric-card">
+                <div class="metric-value">{}</div>
+                <div class="metric-label">States & UTs</div>
+            </div>
+            """.format(summary['n_states']), unsafe_allow_html=True)
+
+        with col3:
+            st.markdown("""
+            <div class="metric-card">
+                <div class="metric-value">{}{}</div>
+                <div class="metric-label">Art Forms</div>
+            </div>
+            """.format(art_forms_prefix, summary['n_art_forms']), unsafe_allow_html=True)
+
+        with col4:
+            st.markdown("""
+            <div class="metric-card">
+                <div class="metric-value">{}₹{:,.0f} Cr</div>
+                <div class="metric-label">Total Funding</div>
+                <div class="metric-error">{}</div>
+            </div>
+            """.format(prefix, summary['total_funding'] / 10000000, funding_note), unsafe_allow_html=True)
+
+    # Prepare data for the map
+    map_data = summary['map_data'].copy()
+
+    if geometry_url:
+        # Geometry is fetched by URL (and cached by the browser); the figure only carries ids and values
+        fig = px.choropleth_mapbox(
+            map_data,
+            geojson=geometry_url,
+            locations="state",
+            featureidkey="id",
+            color="tourist_visits",
+            hover_name="state",
+            hover_data={"state": False, "visits_moe": ":,.0f"} if approximate else {"state": False},
+            color_continuous_scale=px.colors.sequential.Plasma,
+            zoom=3.5,
+            center={"lat": 23.5937, "lon": 78.9629},
+            opacity=0.7,
+            height=500,
+            labels={"tourist_visits": "Tourist Visits", "visits_moe": "± (95% CI)"}
+        )
+
+        fig.update_layout(
+            mapbox_style="carto-positron",
+            margin={"r": 0, "t": 0, "l": 0, "b": 0},
+            coloraxis_colorbar=dict(title="Tourist Visits"),
+        )
+
+        show_chart(fig, container=map_placeholder)
+    else:
+        # Scale the size of circles based on tourist visits
+        max_visits = map_data['tourist_visits'].max()
+        map_data['size'] = map_data['tourist_visits'] / max_visits * 30
+
+        hover_data = {"tourist_visits": True, "latitude": False, "longitude": False, "size": False}
+        if approximate:
+            hover_data["visits_moe"] = ":,.0f"
+
+        # Create the map
+        fig = px.scatter_mapbox(
+            map_data,
+            lat="latitude",
+            lon="longitude",
+            size="size",
+            color="tourist_visits",
+            hover_name="state",
+            hover_data=hover_data,
+            color_continuous_scale=px.colors.sequential.Plasma,
+            zoom=4,
+            center={"lat": 23.5937, "lon": 78.9629},
+            opacity=0.7,
+            height=500,
+            title="Tourist Visits by State",
+            labels={"tourist_visits": "Tourist Visits", "visits_moe": "± (95% CI)"}
+        )
+
+        fig.update_layout(
+            mapbox_style="carto-positron",
+            margin={"r": 0, "t": 0, "l": 0, "b": 0},
+            coloraxis_colorbar=dict(title="Tourist Visits"),
+        )
+
+        show_chart(fig, container=map_placeholder)
+
+    # Get top 10 states by tourist visits
+    top_states = summary['top_states']
+
+    # Create a bar chart for top states
+    fig = px.bar(
+        top_states,
+        x='tourist_visits',
+        y='state',
+        orientation='h',
+        error_x='visits_moe' if approximate else None,
+        color='tourist_visits',
+        color_continuous_scale=px.colors.sequential.Viridis,
+        labels={'tourist_visits': 'Number of Visitors', 'state': 'State', 'visits_moe': '± (95% CI)'},
+        height=500
+    )
+
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        margin=dict(l=0, r=0, t=10, b=0),
+        xaxis_title="Tourist Visits",
+        yaxis_title=None,
+    )
+
+    show_chart(fig, container=top_states_placeholder)
+
+# Relative tourist volume by day of week (Monday first)
+DAILY_WEEKDAY_WEIGHTS = np.array([0.85, 0.8, 0.85, 0.9, 1.05, 1.3, 1.25])
+
+# Rolling window lengths (days) precomputed at load
+ROLLING_WINDOWS = [7, 30, 90]
+
+# Largest date span (days) shown at each time bucket before moving to a coarser one
+TIME_BUCKET_SPANS = [('day', 120), ('week', 550), ('month', 1830), ('quarter', 3660)]
+
+# Resampling rules for each time bucket
+TIME_BUCKET_RULES = {'week': 'W-MON', 'month': 'MS', 'quarter': 'QS', 'year': 'YS'}
+
+# Function to split monthly facts into daily (state) facts that add back up to the monthly totals
+def expand_monthly_to_daily(monthly_df, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Daily views are per state, so art forms are summed away before multiplying rows by ~30;
+    # sorting the groups makes the random split independent of how the input rows are ordered
+    monthly_df = monthly_df.groupby(['year', 'month', 'state', 'region'], observed=True, sort=True)[
+        ['tourist_visits', 'funding_received']].sum().reset_index()
+
+    month_start = pd.to_datetime(pd.DataFrame({
+        'year': monthly_df['year'],
+        'month': monthly_df['month'],
+        'day': 1
+    }))
+    days_in_month = month_start.dt.days_in_month.to_numpy()
+
+    # One output row per day of each monthly record
+    row_idx = np.repeat(np.arange(len(monthly_df)), days_in_month)
+    group_start = np.repeat(np.cumsum(days_in_month) - days_in_month, days_in_month)
+    day_offset = np.arange(len(row_idx)) - group_start
+    dates = pd.DatetimeIndex(month_start.to_numpy()[row_idx] + day_offset.astype('timedelta64[D]'))
+
+    # Day-of-week pattern with some noise, normalised within each month
+    weights = DAILY_WEEKDAY_WEIGHTS[dates.dayofweek] * rng.gamma(20, 1 / 20, len(row_idx))
+    month_weight = np.bincount(row_idx, weights=weights)
+    cumulative = np.cumsum(weights)
+    weight_before_month = cumulative[np.cumsum(days_in_month) - 1] - month_weight
+    share_to_date = (cumulative - weight_before_month[row_idx]) / month_weight[row_idx]
+
+    daily = pd.DataFrame({
+        'date': dates,
+        'year': dates.year,
+        'month': dates.month,
+        'state': monthly_df['state'].to_numpy()[row_idx],
+        'region': monthly_df['region'].to_numpy()[row_idx]
+    })
+
+    # Cumulative rounding keeps every monthly total exact
+    first_day = day_offset == 0
+    for column in ['tourist_visits', 'funding_received']:
+        allocated = np.rint(monthly_df[column].to_numpy()[row_idx] * share_to_date)
+        previous = np.where(first_day, 0, np.roll(allocated, 1))
+        daily[column] = (allocated - previous).astype('int64')
+
+    return daily
+
+# Function to get the start of the time bucket containing a date
+def bucket_floor(date, bucket):
+    date = pd.Timestamp(date).normalize()
+    if bucket == 'day':
+        return date
+    if bucket == 'week':
+        return date - pd.Timedelta(days=date.dayofweek)
+    if bucket == 'month':
+        return date.replace(day=1)
+    if bucket == 'quarter':
+        return date.replace(day=1, month=(date.month - 1) // 3 * 3 + 1)
+    return date.replace(day=1, month=1)
+
+# Function to compute trailing rolling sums from a cumulative-sum table
+def rolling_from_cumulative(cumulative, window):
+    return cumulative - cumulative.shift(window, fill_value=0)
+
+# Function to roll a (date x state) table up into week (Monday start), month, quarter and year buckets
+def compute_time_buckets(daily):
+    # Weeks and months come from days; quarters from months; years from quarters
+    week = daily.resample(TIME_BUCKET_RULES['week'], label='left', closed='left').sum()
+    month = daily.resample(TIME_BUCKET_RULES['month']).sum()
+    quarter = month.resample(TIME_BUCKET_RULES['quarter']).sum()
+    year = quarter.resample(TIME_BUCKET_RULES['year']).sum()
+    return {'week': week, 'month': month, 'quarter': quarter, 'year': year}
+
+# Function to build the daily (date x state) table with rolling windows and bucket rollups
+# (estimated when the daily facts were derived from monthly totals)
+def build_daily_rollups(daily_df, estimated=False):
+    daily = daily_df.pivot_table(index='date', columns='state', values='tourist_visits',
+                                 aggfunc='sum', fill_value=0)
+    daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'), fill_value=0)
+    cumulative = daily.cumsum()
+
+    return {
+        'daily': daily,
+        'cumulative': cumulative,
+        'rolling': {window: rolling_from_cumulative(cumulative, window) for window in ROLLING_WINDOWS},
+        'buckets': compute_time_buckets(daily),
+        'state_region': daily_df.groupby('state')['region'].first(),
+        'estimated': estimated
+    }
+
+# Function to pick the time bucket for a date range so charts stay at a readable number of points
+def select_time_bucket(start, end):
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for bucket, max_days in TIME_BUCKET_SPANS:
+        if span <= max_days:
+            return bucket
+    return 'year'
+
+# Function to get a bucketed series for a set of states over a date range
+def daily_trend_series(rollups, states, start, end, window=None):
+    bucket = select_time_bucket(start, end)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+    if window is None:
+        table = rollups['daily'] if bucket == 'day' else rollups['buckets'][bucket]
+        return table.loc[bucket_floor(start, bucket):end, states].sum(axis=1), bucket
+
+    # Rolling sums are read at the last day of each bucket
+    series = rollups['rolling'][window].loc[start:end, states].sum(axis=1)
+    if bucket != 'day':
+        series = series.groupby([bucket_floor(date, bucket) for date in series.index]).last()
+    return series, bucket
+
+# Cache the daily rollups derived from the monthly table (the daily facts themselves are not kept)
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def load_derived_daily_rollups(_df, fingerprint):
+    return build_daily_rollups(expand_monthly_to_daily(_df), estimated=True)
+
+# Anomaly detection settings
+ANOMALY_THRESHOLD = 3.5  # robust z-score above which a month is flagged
+ANOMALY_MIN_OBSERVATIONS = 12  # shorter series are not scored
+ANOMALY_ALL_ART_FORMS = 'All art forms'
+
+# Function to score every (state, art form) monthly series for anomalies in one vectorized pass
+def detect_anomalies(df):
+    # Per-art-form series plus one total series per state
+    by_art_form = df.groupby(['state', 'art_form', 'year', 'month'])['tourist_visits'].sum().reset_index()
+    totals = df.groupby(['state', 'year', 'month'])['tourist_visits'].sum().reset_index()
+    totals['art_form'] = ANOMALY_ALL_ART_FORMS
+    facts = pd.concat([by_art_form, totals], ignore_index=True)
+
+    # (series x year x month) array, NaN where a series has no record
+    series_keys = facts[['state', 'art_form']].drop_duplicates().reset_index(drop=True)
+    series_idx = facts.merge(series_keys.reset_index(), on=['state', 'art_form'])['index'].to_numpy()
+    years = np.sort(facts['year'].unique())
+    year_idx = np.searchsorted(years, facts['year'].to_numpy())
+    month_idx = facts['month'].to_numpy() - 1
+
+    values = np.full((len(series_keys), len(years), 12), np.nan)
+    values[series_idx, year_idx, month_idx] = np.log1p(facts['tourist_visits'].to_numpy().clip(min=0))
+
+    # Months seen fewer than twice fall back to the state's total-series profile
+    state_total_row = series_keys.reset_index().set_index(['state', 'art_form'])['index']
+    total_rows = state_total_row.reindex(
+        pd.MultiIndex.from_arrays([series_keys['state'], [ANOMALY_ALL_ART_FORMS] * len(series_keys)])
+    ).to_numpy()
+    scores, fitted = score_series(values, total_rows)
+
+    observations = np.sum(~np.isnan(values), axis=(1, 2))
+    scores[observations < ANOMALY_MIN_OBSERVATIONS] = np.nan
+
+    # Long table of every scored point
+    s, y, m = np.nonzero(~np.isnan(scores))
+    return pd.DataFrame({
+        'state': series_keys['state'].to_numpy()[s],
+        'art_form': series_keys['art_form'].to_numpy()[s],
+        'year': years[y],
+        'month': m + 1,
+        'tourist_visits': np.expm1(values[s, y, m]).round().astype(np.int64),
+        'expected_visits': np.expm1(fitted[s, y, m]).round().astype(np.int64),
+        'score': scores[s, y, m]
+    })
+
+# Cache the anomaly scores per dataset
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def load_anomaly_scores(_df, fingerprint):
+    return detect_anomalies(_df)
+
+# Function to run STL decomposition for every state and region monthly series
+def build_seasonal_decomposition(df):
+    monthly = df.groupby(['year', 'month', 'state', 'region'])['tourist_visits'].sum().reset_index()
+    monthly['date'] = pd.to_datetime(monthly[['year', 'month']].assign(day=1))
+    dates = pd.date_range(monthly['date'].min(), monthly['date'].max(), freq='MS')
+
+    # One row per state and per region, one column per month (gaps stay NaN)
+    table = pd.concat([
+        monthly.pivot_table(index='state', columns='date', values='tourist_visits', aggfunc='sum'),
+        monthly.pivot_table(index='region', columns='date', values='tourist_visits', aggfunc='sum')
+    ], keys=['State', 'Region'], names=['level', 'name']).reindex(columns=dates)
+
+    result = decompose_series(table.to_numpy(), first_month=dates[0].month)
+
+    components = pd.concat([
+        pd.DataFrame(values, index=table.index, columns=dates).stack().rename('value').reset_index()
+        .rename(columns={'level_2': 'date'}).assign(component=component)
+        for component, values in [('Observed', table.to_numpy()), ('Trend', result['trend']),
+                                  ('Seasonal', result['seasonal']), ('Residual', result['resid'])]
+    ], ignore_index=True)
+
+    # Typical visits in the peak month across all years
+    peak_visits = [
+        table.iloc[i, (dates.month == month).nonzero()[0]].mean() if month > 0 else np.nan
+        for i, month in enumerate(result['peak_month'])
+    ]
+
+    peaks = table.index.to_frame(index=False).assign(
+        peak_month=result['peak_month'],
+        peak_season=result['peak_season'],
+        seasonal_strength=result['strength'],
+        peak_visits=peak_visits
+    )
+
+    return {'components': components, 'peaks': peaks}
+
+# Cache the seasonal decomposition per dataset
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def load_seasonal_decomposition(_df, fingerprint):
+    return build_seasonal_decomposition(_df)
+
+# Similar destinations settings
+SIMILAR_DESTINATIONS_K = 5
+SIMILARITY_PROFILES = {'Seasonality and art forms': (0.5, 0.5), 'Seasonality': (1.0, 0.0), 'Art form mix': (0.0, 1.0)}
+
+# Function to build normalized tourism profiles: visits per calendar month and per kind of art form
+def build_profile_vectors(df, entity='state'):
+    entities, entity_idx = np.unique(df[entity].to_numpy(), return_inverse=True)
+    art_forms, art_form_idx = np.unique(df['art_form'].to_numpy(), return_inverse=True)
+    kinds, kind_of_art_form = np.unique([art_form_kind(art_form) for art_form in art_forms], return_inverse=True)
+    kind_idx = kind_of_art_form[art_form_idx]
+    visits = df['tourist_visits'].to_numpy(dtype=float)
+
+    seasonal = np.bincount(entity_idx * 12 + df['month'].to_numpy() - 1, weights=visits,
+                           minlength=len(entities) * 12).reshape(len(entities), 12)
+    art_form = np.bincount(entity_idx * len(kinds) + kind_idx, weights=visits,
+                           minlength=len(entities) * len(kinds)).reshape(len(entities), len(kinds))
+
+    # Unit-length rows, so a dot product is a cosine similarity
+    def normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    return {
+        'entities': entities,
+        'seasonal': normalize(seasonal),
+        'art_form': normalize(art_form)
+    }
+
+# Function to find the k most similar entities for every entity in one matrix pass
+def top_k_similar(profiles, k=SIMILAR_DESTINATIONS_K):
+    similarity = profiles @ profiles.T
+    np.fill_diagonal(similarity, -np.inf)
+    k = min(k, len(profiles) - 1)
+    if k <= 0:
+        return np.zeros((len(profiles), 0), dtype=int), np.zeros((len(profiles), 0))
+
+    neighbors = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(similarity, neighbors, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(neighbors, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+# Function to build the similar-destinations index plus state/region lookups
+def build_similarity_index(df, entity='state', k=SIMILAR_DESTINATIONS_K):
+    vectors = build_profile_vectors(df, entity)
+    entities = vectors['entities']
+    region_of = df.groupby(entity)['region'].first().to_dict()
+    members_of_region = {}
+    for name in entities:
+        members_of_region.setdefault(region_of[name], []).append(name)
+
+    index = {
+        'entities': entities,
+        'position': {name: i for i, name in enumerate(entities)},
+        'seasonal': vectors['seasonal'],
+        'region_of': region_of,
+        'members_of_region': members_of_region,
+        'neighbors': {}
+    }
+    for profile, (seasonal_weight, art_form_weight) in SIMILARITY_PROFILES.items():
+        combined = np.hstack([np.sqrt(seasonal_weight) * vectors['seasonal'],
+                              np.sqrt(art_form_weight) * vectors['art_form']])
+        index['neighbors'][profile] = top_k_similar(combined, k)
+    return index
+
+# Function to look up the most similar entities from the index
+def similar_destinations(index, name, profile):
+    neighbors, scores = index['neighbors'][profile]
+    position = index['position'][name]
+    names = index['entities'][neighbors[position]]
+    return pd.DataFrame({
+        'state': names,
+        'region': [index['region_of'][other] for other in names],
+        'similarity': scores[position]
+    })
+
+# Cache the similarity index per dataset
+@st.cache_data(show_spinner=False, max_entries=SNAPSHOT_CACHE_ENTRIES)
+def load_similarity_index(_df, fingerprint):
+    return build_similarity_index(_df)
+
+# Background refresh: REFRESH_SOURCE=warehouse reloads tourism_data with SNOWFLAKE_* credentials,
+# REFRESH_SOURCE=file reloads FACT_TABLE_PATH
+REFRESH_SOURCE = os.environ.get('REFRESH_SOURCE', 'mock')
+REFRESH_SOURCE_LABELS = {'mock': "Mock Data", 'warehouse': "Warehouse Snapshot", 'file': "Local Fact File"}
+REFRESH_INTERVAL_SECONDS = float(os.environ.get('REFRESH_INTERVAL_SECONDS', 3600))  # 0 = load once
+REFRESH_WAIT_SECONDS = 120  # how long a session waits for the first snapshot
+REFRESH_POPULAR_FILTERS = 5  # most-used filter combinations pre-summed on each refresh
+
+# Function to key a filter selection for usage counting
+def filter_usage_key(selected_year, selected_region, selected_months):
+    return (selected_year, tuple(sorted(selected_region)), tuple(sorted(selected_months)))
+
+# Function to load the dataset the background refresh serves
+def load_refresh_data():
+    if REFRESH_SOURCE == 'warehouse':
+        # Failures keep the previous snapshot rather than swapping in mock data
+        return query_snowflake_data(warehouse_credentials_from_env(), strict=True)
+    if REFRESH_SOURCE == 'file':
+        return load_fact_file(FACT_TABLE_PATH, file_version(FACT_TABLE_PATH))
+    return load_mock_data()
+
+# Function to build a snapshot for a dataset, warming every cache the dashboard reads on a rerun
+def build_refresh_snapshot(df, fingerprint, popular_keys):
+    daily_df = query_snowflake_daily_data(warehouse_credentials_from_env()) if REFRESH_SOURCE == 'warehouse' else None
+    if daily_df is None:
+        daily_rollups = load_derived_daily_rollups(df, fingerprint)
+    else:
+        daily_rollups = build_daily_rollups(daily_df)
+    build_preview_sample(df, fingerprint)
+    load_anomaly_scores(df, fingerprint)
+    load_seasonal_decomposition(df, fingerprint)
+    load_similarity_index(df, fingerprint)
+
+    # Pre-sum the default view (latest year, everything selected) and the most-used filter combinations
+    cube = build_filter_cube(df, fingerprint)
+    default_key = filter_usage_key(df['year'].max(), df['region'].unique(), range(1, 13))
+    filter_summaries = {}
+    for year, regions, months in [default_key] + popular_keys:
+        cells = selected_filter_cells(cube, year, regions, months)
+        filter_summaries[cells] = sum_cells(cube, cells)
+
+    return {'df': df, 'daily_rollups': daily_rollups, 'filter_summaries': filter_summaries}
+
+# Start the refresh worker once per server process
+@st.cache_resource(show_spinner=False)
+def get_refresh_worker():
+    worker = RefreshWorker(load_refresh_data, dataset_fingerprint, build_refresh_snapshot,
+                           interval=REFRESH_INTERVAL_SECONDS, popular_count=REFRESH_POPULAR_FILTERS)
+    return worker.start()
+
+# Quiet period after the last live filter edit before the dashboard recomputes
+FILTER_DEBOUNCE_SECONDS = 0.4
+
+# Function to note when a live filter last changed (for debouncing)
+def mark_filter_change():
+    st.session_state.filter_changed_at = time.monotonic()
+
 # Sidebar Configuration
 st.sidebar.markdown("<h2 style='text-align: center;'>Settings</h2>", unsafe_allow_html=True)
 
 # Data source selection
-data_source = st.sidebar.radio("Select Data Source", ["Mock Data", "Snowflake Connection"])
+data_sources = ["Mock Data", "Snowflake Connection"]
+if FACT_TABLE_PATH:
+    data_sources.insert(0, "Local Fact File")
+snapshot_source = REFRESH_SOURCE_LABELS[REFRESH_SOURCE]
+if snapshot_source not in data_sources:
+    data_sources.insert(0, snapshot_source)
+data_source = st.sidebar.radio("Select Data Source", data_sources)
+
+# Daily rollups come from the warehouse when available, otherwise from the monthly table
+daily_rollups = None
+
+# Filter totals pre-summed by the background refresh for the snapshot being shown
+prewarmed_filters = None
+
+refresh_worker = get_refresh_worker()
 
-if data_source == "Mock Data":
-    df = generate_mock_data()
+if data_source == snapshot_source:
+    # Every rerun reads one complete snapshot; a refresh swaps in the next one between reruns
+    snapshot = refresh_worker.current(timeout=REFRESH_WAIT_SECONDS)
+    if snapshot is not None:
+        df, daily_rollups = snapshot['df'], snapshot['daily_rollups']
+        prewarmed_filters = snapshot['filter_summaries']
+        refreshed_at = pd.Timestamp.fromtimestamp(snapshot['built_at']).strftime('%Y-%m-%d %H:%M')
+        st.sidebar.caption(f"Data refreshed {refreshed_at}")
+    else:
+        if refresh_worker.status['error']:
+            st.sidebar.warning(f"Background refresh failed: {refresh_worker.status['error']}")
+        df = load_mock_data()
+elif data_source == "Mock Data":
+    df = load_mock_data()
+elif data_source == "Local Fact File":
+    with st.spinner("Loading fact table..."):
+        df = load_fact_file(FACT_TABLE_PATH, file_version(FACT_TABLE_PATH))
 else:
     # Snowflake connection credentials
     st.sidebar.subheader("Snowflake Credentials")
@@ -312,80 +1158,92 @@ else:
     if st.sidebar.button("Connect to Snowflake"):
         with st.spinner("Connecting to Snowflake..."):
             df = query_snowflake_data()
+            daily_df = query_snowflake_daily_data()
+            if daily_df is not None:
+                daily_rollups = build_daily_rollups(daily_df)
     else:
-        df = generate_mock_data()
+        df = load_mock_data()
+
+fingerprint = dataset_fingerprint(df)
+if daily_rollups is None:
+    daily_rollups = load_derived_daily_rollups(df, fingerprint)
 
 # Filter controls
 st.sidebar.markdown("---")
 st.sidebar.subheader("Filters")
 
-# Year selection
-years = sorted(df['year'].unique())
-selected_year = st.sidebar.selectbox("Select Year", years, index=len(years)-1)  # Default to most recent year
+# Apply mode collects filter edits and commits them in one rerun; live mode debounces rapid edits
+apply_filters_manually = st.sidebar.toggle(
+    "Apply filters manually",
+    value=True,
+    help="Edit several filters, then apply them together instead of rerunning after every click."
+)
+filter_panel = st.sidebar.form("filter_panel") if apply_filters_manually else st.sidebar
+filter_callbacks = {} if apply_filters_manually else {'on_change': mark_filter_change}
 
-# Filter by region
+years = sorted(df['year'].unique())
 regions = sorted(df['region'].unique())
-selected_region = st.sidebar.multiselect("Filter by Region", regions, default=regions)
-
-# Month selection for seasonal analysis
 months = list(range(1, 13))
-month_names = ["January", "February", "March", "April", "May", "June", 
-              "July", "August", "September", "October", "November", "December"]
-month_dict = {i+1: month for i, month in enumerate(month_names)}
-selected_months = st.sidebar.multiselect("Select Months", options=months, 
-                                       default=months, format_func=lambda x: month_dict[x])
 
-# Apply filters
-filtered_df = df[(df['year'] == selected_year) & 
-                (df['region'].isin(selected_region)) &
-                (df['month'].isin(selected_months))]
+# Committed filter values live in session state under the widget keys. Switching modes moves the
+# widgets in or out of the form, which makes them new widgets, so the values are carried over
+# (and kept valid for the current dataset) before the widgets are drawn.
+filter_year = st.session_state.get('filter_year')
+st.session_state.filter_year = filter_year if filter_year in years else years[-1]  # Default to most recent year
+st.session_state.filter_regions = [region for region in st.session_state.get('filter_regions', regions) if region in regions]
+st.session_state.filter_months = st.session_state.get('filter_months', months)
 
-# Aggregate data by state
-state_agg = filtered_df.groupby('state').agg({
-    'tourist_visits': 'sum',
-    'funding_received': 'sum'
-}).reset_index()
+with filter_panel:
+    # Year selection
+    selected_year = st.selectbox("Select Year", years, key='filter_year', **filter_callbacks)
 
-# Get top 10 states by tourist visits
-top_states = state_agg.sort_values('tourist_visits', ascending=False).head(10)
+    # Filter by region
+    selected_region = st.multiselect("Filter by Region", regions, key='filter_regions', **filter_callbacks)
 
-# Main Area
-st.markdown("<h1 class='main-header'>🏛️ Art, Culture & Tourism in India</h1>", unsafe_allow_html=True)
+    # Month selection for seasonal analysis
+    month_names = ["January", "February", "March", "April", "May", "June", 
+                  "July", "August", "September", "October", "November", "December"]
+    month_dict = {i+1: month for i, month in enumerate(month_names)}
+    selected_months = st.multiselect("Select Months", options=months, key='filter_months',
+                                     format_func=lambda x: month_dict[x], **filter_callbacks)
 
-# Key Metrics Row
-col1, col2, col3, col4 = st.columns(4)
+    if apply_filters_manually:
+        st.form_submit_button("Apply filters", use_container_width=True)
 
-with col1:
-    st.markdown("""
-    <div class="metric-card">
-        <div class="metric-value">{:,}</div>
-        <div class="metric-label">Total Tourist Visits</div>
-    </div>
-    """.format(int(filtered_df['tourist_visits'].sum())), unsafe_allow_html=True)
+filter_status = st.sidebar.empty()
+if not apply_filters_manually:
+    # Wait out a burst of edits; each new edit requests a rerun that supersedes this one
+    remaining = FILTER_DEBOUNCE_SECONDS - (time.monotonic() - st.session_state.get('filter_changed_at', -np.inf))
+    if remaining > 0:
+        time.sleep(remaining)
+        # First element after the pause: a superseded run stops here, before any heavy work
+        filter_status.caption("Updating results...")
 
-with col2:
-    st.markdown("""
-    <div class="metric-card">
-        <div class="metric-value">{}</div>
-        <div class="metric-label">States & UTs</div>
-    </div>
-    """.format(len(filtered_df['state'].unique())), unsafe_allow_html=True)
+# Fast preview renders approximate results first, then swaps in the exact ones
+st.sidebar.markdown("---")
+fast_preview = st.sidebar.checkbox(
+    "Fast preview (approximate first)",
+    value=False,
+    help="Render the overview from a stratified sample with error bounds, then refine to exact results."
+)
 
-with col3:
-    st.markdown("""
-    <div class="metric-card">
-        <div class="metric-value">{}</div>
-        <div class="metric-label">Art Forms</div>
-    </div>
-    """.format(len(filtered_df['art_form'].unique())), unsafe_allow_html=True)
+# Anomaly sensitivity
+anomaly_threshold = st.sidebar.slider(
+    "Anomaly threshold (robust z-score)",
+    min_value=2.0, max_value=6.0, value=ANOMALY_THRESHOLD, step=0.5,
+    help="Months whose seasonally adjusted visits deviate by more than this are flagged."
+)
 
-with col4:
-    st.markdown("""
-    <div class="metric-card">
-        <div class="metric-value">₹{:,.0f} Cr</div>
-        <div class="metric-label">Total Funding</div>
-    </div>
-    """.format(filtered_df['funding_received'].sum() / 10000000), unsafe_allow_html=True)
+anomaly_scores = load_anomaly_scores(df, fingerprint)
+seasonal_decomposition = load_seasonal_decomposition(df, fingerprint)
+similarity_index = load_similarity_index(df, fingerprint)
+anomalies = anomaly_scores[anomaly_scores['score'].abs() > anomaly_threshold]
+
+# Main Area
+st.markdown("<h1 class='main-header'>🏛️ Art, Culture & Tourism in India</h1>", unsafe_allow_html=True)
+
+# Key Metrics Row
+kpi_placeholder = st.empty()
 
 st.markdown("---")
 
@@ -394,65 +1252,54 @@ col1, col2 = st.columns([3, 2])
 
 with col1:
     st.markdown("<h2 class='sub-header'>🗺️ Tourism Map of India</h2>", unsafe_allow_html=True)
-    
-    # Prepare data for the map
-    map_data = filtered_df.groupby(['state', 'latitude', 'longitude']).agg({
-        'tourist_visits': 'sum'
-    }).reset_index()
-    
-    # Scale the size of circles based on tourist visits
-    max_visits = map_data['tourist_visits'].max()
-    map_data['size'] = map_data['tourist_visits'] / max_visits * 30
-    
-    # Create the map
-    fig = px.scatter_mapbox(
-        map_data,
-        lat="latitude",
-        lon="longitude",
-        size="size",
-        color="tourist_visits",
-        hover_name="state",
-        hover_data={"tourist_visits": True, "latitude": False, "longitude": False, "size": False},
-        color_continuous_scale=px.colors.sequential.Plasma,
-        zoom=4,
-        center={"lat": 23.5937, "lon": 78.9629},
-        opacity=0.7,
-        height=500,
-        title="Tourist Visits by State",
-        labels={"tourist_visits": "Tourist Visits"}
-    )
-    
-    fig.update_layout(
-        mapbox_style="carto-positron",
-        margin={"r": 0, "t": 0, "l": 0, "b": 0},
-        coloraxis_colorbar=dict(title="Tourist Visits"),
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    geometry_urls = load_state_geometry_urls()
+    map_col1, map_col2 = st.columns(2)
+
+    with map_col1:
+        map_style = st.radio("Map style", ["Bubbles", "Choropleth"], horizontal=True)
+
+    geometry_url = None
+    if map_style == "Choropleth":
+        if geometry_urls:
+            with map_col2:
+                boundary_detail = st.select_slider("Boundary detail", options=list(geometry_urls), value="medium")
+            geometry_url = geometry_urls[boundary_detail]
+        else:
+            st.info(f"State boundaries not found. Set INDIA_STATES_GEOJSON to a GeoJSON file or URL "
+                    f"(currently '{STATE_GEOJSON_SOURCE}').")
+
+    map_placeholder = st.empty()
 
 with col2:
     st.markdown("<h2 class='sub-header'>🏆 Top 10 Tourist States</h2>", unsafe_allow_html=True)
-    
-    # Create a bar chart for top states
-    fig = px.bar(
-        top_states,
-        x='tourist_visits',
-        y='state',
-        orientation='h',
-        color='tourist_visits',
-        color_continuous_scale=px.colors.sequential.Viridis,
-        labels={'tourist_visits': 'Number of Visitors', 'state': 'State'},
-        height=500
-    )
-    
-    fig.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        margin=dict(l=0, r=0, t=10, b=0),
-        xaxis_title="Tourist Visits",
-        yaxis_title=None,
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    top_states_placeholder = st.empty()
+
+# The preview only helps while the exact cube is being built; once it is cached, exact results are immediate
+if fast_preview and fingerprint not in built_filter_cubes():
+    preview = build_preview_sample(df, fingerprint)
+    preview_summary = estimate_preview_aggregates(preview, selected_year, selected_region, selected_months)
+    render_overview(preview_summary, kpi_placeholder, map_placeholder, top_states_placeholder, approximate=True,
+                    geometry_url=geometry_url)
+
+# Apply filters: aggregates are maintained incrementally from per-cell partials
+filter_cube = build_filter_cube(df, fingerprint)
+filter_cells = selected_filter_cells(filter_cube, selected_year, selected_region, selected_months)
+
+# Count each newly applied filter combination so the next refresh pre-sums the popular ones
+filter_key = filter_usage_key(selected_year, selected_region, selected_months)
+if st.session_state.get('last_filter_key') != filter_key:
+    st.session_state.last_filter_key = filter_key
+    refresh_worker.record_usage(filter_key)
+filter_aggregates = maintain_filter_aggregates(filter_cube, fingerprint, filter_cells, st.session_state,
+                                               prewarmed=prewarmed_filters)
+exact_summary = compute_exact_aggregates(filter_cube, filter_aggregates)
+
+# Aggregate data by state
+state_agg = exact_summary['state_agg']
+
+# Exact results replace the preview in place
+render_overview(exact_summary, kpi_placeholder, map_placeholder, top_states_placeholder, geometry_url=geometry_url)
 
 st.markdown("---")
 
@@ -463,8 +1310,8 @@ st.markdown("<h2 class='sub-header'>🏞️ State-wise Cultural Tourism Analysis
 all_states = sorted(df['state'].unique())
 selected_state_analysis = st.selectbox("Select a state to explore its art forms and funding", all_states)
 
-# Filter data for selected state
-state_data = filtered_df[filtered_df['state'] == selected_state_analysis]
+# Filter data for selected state (sliced straight from its rows in the selected cells)
+state_data = filter_rows(df, filter_cube, filter_cells, selected_state_analysis)
 
 if not state_data.empty:
     col1, col2 = st.columns([1, 1])
@@ -490,7 +1337,7 @@ if not state_data.empty:
         fig.update_traces(textposition='inside', textinfo='percent+label')
         fig.update_layout(margin=dict(t=40, b=0, l=0, r=0))
         
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
         
         st.markdown("</div>", unsafe_allow_html=True)
         
@@ -514,7 +1361,7 @@ if not state_data.empty:
             margin=dict(t=40, b=0, l=0, r=0)
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
         
         st.markdown("</div>", unsafe_allow_html=True)
     
@@ -547,22 +1394,36 @@ if not state_data.empty:
         margin=dict(l=0, r=0, t=10, b=0)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    # Overlay months flagged for the state total or any of its art forms
+    state_anomalies = anomalies[(anomalies['state'] == selected_state_analysis) & (anomalies['year'] == selected_year)]
+    if not state_anomalies.empty:
+        flagged = state_anomalies.groupby('month').agg(
+            detail=('art_form', lambda art_forms: ', '.join(sorted(art_forms))),
+            score=('score', lambda scores: scores.loc[scores.abs().idxmax()])
+        ).reset_index().merge(monthly_agg, on='month')
+        fig.add_scatter(
+            x=flagged['month_name'],
+            y=flagged['tourist_visits'],
+            mode='markers',
+            marker=dict(color='red', size=14, symbol='x'),
+            name='Anomaly',
+            customdata=np.column_stack([flagged['detail'], flagged['score']]),
+            hovertemplate="%{x}: %{y:,}<br>Unusual: %{customdata[0]}<br>Score: %{customdata[1]:.1f}<extra></extra>"
+        )
+    
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Regional comparison
     st.markdown("<div class='card'>", unsafe_allow_html=True)
-    region_of_state = df[df['state'] == selected_state_analysis]['region'].iloc[0]
+    region_of_state = similarity_index['region_of'][selected_state_analysis]
     st.subheader(f"Comparing {selected_state_analysis} with Other States in {region_of_state} Region")
     
     # Get states in the same region
-    states_in_region = df[df['region'] == region_of_state]['state'].unique()
+    states_in_region = similarity_index['members_of_region'][region_of_state]
     
     # Aggregate data for regional comparison
-    region_comp = filtered_df[filtered_df['state'].isin(states_in_region)].groupby('state').agg({
-        'tourist_visits': 'sum',
-        'funding_received': 'sum'
-    }).reset_index()
+    region_comp = state_agg[state_agg['state'].isin(states_in_region)].reset_index(drop=True)
     
     # Calculate funding per visitor
     region_comp['funding_per_visitor'] = region_comp['funding_received'] / region_comp['tourist_visits']
@@ -587,11 +1448,123 @@ if not state_data.empty:
         margin=dict(l=0, r=0, t=10, b=0)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Similar destinations across all regions, from precomputed profile neighbors
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.subheader(f"Destinations Similar to {selected_state_analysis}")
+    similarity_profile = st.radio("Match on", list(SIMILARITY_PROFILES), horizontal=True)
+    similar = similar_destinations(similarity_index, selected_state_analysis, similarity_profile)
+
+    col1, col2 = st.columns([2, 3])
+
+    with col1:
+        st.dataframe(
+            similar.rename(columns={'state': 'State', 'region': 'Region', 'similarity': 'Similarity'}),
+            hide_index=True,
+            use_container_width=True,
+            column_config={'Similarity': st.column_config.ProgressColumn(format="%.2f", min_value=0, max_value=1)}
+        )
+
+    with col2:
+        # Seasonal profiles (share of visits per calendar month) of the state and its matches
+        compared = [selected_state_analysis] + list(similar['state'])
+        profiles = similarity_index['seasonal'][[similarity_index['position'][name] for name in compared]]
+        profiles = profiles / profiles.sum(axis=1, keepdims=True)
+        profile_df = pd.DataFrame(profiles, index=compared, columns=month_names[:12]).stack().reset_index()
+        profile_df.columns = ['state', 'month', 'share']
+
+        fig = px.line(
+            profile_df,
+            x='month',
+            y='share',
+            color='state',
+            labels={'share': 'Share of Annual Visits', 'month': 'Month', 'state': 'State'},
+            height=350
+        )
+        fig.update_traces(line=dict(width=1.5))
+        fig.update_traces(selector=dict(name=selected_state_analysis), line=dict(width=4))
+        fig.update_layout(yaxis_tickformat='.0%', margin=dict(l=0, r=0, t=10, b=0))
+        show_chart(fig)
+
     st.markdown("</div>", unsafe_allow_html=True)
 else:
     st.error(f"No data available for {selected_state_analysis} with the current filters")
 
+# Nearby Heritage Sites
+st.markdown("---")
+st.markdown("<h2 class='sub-header'>📍 Nearby Heritage Sites</h2>", unsafe_allow_html=True)
+
+site_index = load_heritage_site_index()
+
+# Clicking a site on the map re-centres the search on it
+if 'nearby_center' not in st.session_state:
+    st.session_state.nearby_center = None
+
+col1, col2, col3 = st.columns([2, 2, 1])
+
+with col1:
+    center_state = st.selectbox("Search around", all_states, index=all_states.index(selected_state_analysis))
+
+with col2:
+    radius_km = st.slider("Radius (km)", min_value=10, max_value=300, value=50, step=10)
+
+with col3:
+    nearest_k = st.number_input("Nearest sites", min_value=1, max_value=50, value=10)
+
+if st.session_state.nearby_center is not None and st.session_state.nearby_center[0] == center_state:
+    center_lat, center_lon = st.session_state.nearby_center[1:]
+else:
+    center_lat, center_lon = STATE_COORDINATES.get(center_state, (23.5937, 78.9629))
+
+nearby_sites = site_index.within_radius(center_lat, center_lon, radius_km)
+nearest_sites = site_index.nearest(center_lat, center_lon, int(nearest_k))
+
+col1, col2 = st.columns([3, 2])
+
+with col1:
+    fig = px.scatter_mapbox(
+        nearby_sites,
+        lat="latitude",
+        lon="longitude",
+        color="category",
+        hover_name="name",
+        hover_data={"distance_km": ":.1f", "latitude": False, "longitude": False, "category": False},
+        custom_data=["site_id"],
+        zoom=7 if radius_km <= 100 else 5,
+        center={"lat": center_lat, "lon": center_lon},
+        height=450,
+        labels={"distance_km": "Distance (km)", "category": "Category"}
+    )
+
+    fig.update_layout(
+        mapbox_style="carto-positron",
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    site_event = show_chart(fig, on_select="rerun", selection_mode="points", key="nearby_sites_map")
+
+    selected_points = site_event.selection.points if site_event else []
+    if selected_points and selected_points[0].get('customdata'):
+        selected_site = site_index.sites.loc[site_index.sites['site_id'] == selected_points[0]['customdata'][0]].iloc[0]
+        new_center = (center_state, selected_site['latitude'], selected_site['longitude'])
+        if st.session_state.nearby_center != new_center:
+            st.session_state.nearby_center = new_center
+            st.rerun()
+
+with col2:
+    st.markdown(f"**{len(nearby_sites):,} sites within {radius_km} km**")
+    st.dataframe(
+        nearest_sites[['name', 'category', 'distance_km']].rename(columns={
+            'name': 'Site', 'category': 'Category', 'distance_km': 'Distance (km)'
+        }).round(1),
+        hide_index=True,
+        use_container_width=True,
+        height=400
+    )
+
 # Add Year-over-Year Comparison
 st.markdown("---")
 st.markdown("<h2 class='sub-header'>📈 Year-over-Year Tourism Growth</h2>", unsafe_allow_html=True)
@@ -624,7 +1597,7 @@ with col1:
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
@@ -655,20 +1628,111 @@ with col2:
         yaxis_title="Growth (%)"
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Daily Trends
+st.markdown("---")
+st.markdown("<h2 class='sub-header'>📅 Daily Tourism Trends</h2>", unsafe_allow_html=True)
+
+first_day = daily_rollups['daily'].index.min().date()
+last_day = daily_rollups['daily'].index.max().date()
+
+if daily_rollups['estimated']:
+    st.caption("No daily table is available, so day-level values are estimated by spreading monthly totals "
+               "over the days of each month. Monthly, quarterly and yearly totals are exact.")
+
+col1, col2 = st.columns([1, 2])
+
+with col1:
+    date_range = st.date_input(
+        "Select date range",
+        value=(max(first_day, last_day - pd.Timedelta(days=89).to_pytimedelta()), last_day),
+        min_value=first_day,
+        max_value=last_day
+    )
+
+with col2:
+    daily_measure = st.radio(
+        "Measure",
+        ["Daily visits", "7-day rolling", "30-day rolling", "90-day rolling"],
+        horizontal=True
+    )
+
+# The date picker returns a single date while a range is being selected
+if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+    range_start, range_end = date_range
+else:
+    range_start = range_end = date_range[0] if isinstance(date_range, (tuple, list)) else date_range
+
+daily_states = [state for state, region in daily_rollups['state_region'].items()
+                if region in selected_region and state in daily_rollups['daily'].columns]
+rolling_window = None if daily_measure == "Daily visits" else int(daily_measure.split('-')[0])
+
+if daily_states:
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+
+    # Same period last year, aligned on the calendar
+    last_year_start = pd.Timestamp(range_start) - pd.DateOffset(years=1)
+    last_year_end = pd.Timestamp(range_end) - pd.DateOffset(years=1)
+
+    current_series, bucket = daily_trend_series(daily_rollups, daily_states, range_start, range_end, rolling_window)
+    last_year_series, _ = daily_trend_series(daily_rollups, daily_states, last_year_start, last_year_end, rolling_window)
+    last_year_series.index = last_year_series.index + pd.DateOffset(years=1)
+
+    daily_trend = pd.concat([
+        pd.DataFrame({'date': current_series.index, 'tourist_visits': current_series.to_numpy(), 'period': 'Selected period'}),
+        pd.DataFrame({'date': last_year_series.index, 'tourist_visits': last_year_series.to_numpy(), 'period': 'Same period last year'})
+    ])
+
+    fig = px.line(
+        daily_trend,
+        x='date',
+        y='tourist_visits',
+        color='period',
+        markers=bucket != 'day',
+        labels={'tourist_visits': f"Tourist Visits ({daily_measure.lower()})", 'date': bucket.capitalize(), 'period': ''},
+        height=400
+    )
+
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=10, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    show_chart(fig)
+
+    # Range totals from the daily table
+    range_total = daily_rollups['daily'].loc[pd.Timestamp(range_start):pd.Timestamp(range_end), daily_states].to_numpy().sum()
+    last_year_total = daily_rollups['daily'].loc[last_year_start:last_year_end, daily_states].to_numpy().sum()
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric(
+            label="Visits in Selected Period",
+            value=f"{int(range_total):,}",
+            delta=f"{(range_total - last_year_total) / last_year_total * 100:.1f}% vs last year" if last_year_total else None
+        )
+
+    with col2:
+        st.metric(label="Same Period Last Year", value=f"{int(last_year_total):,}")
+
+    with col3:
+        st.metric(label="Chart Granularity", value=bucket.capitalize())
+
     st.markdown("</div>", unsafe_allow_html=True)
+else:
+    st.info("Select at least one region to see daily trends")
 
 # Art and Culture Showcase
 st.markdown("---")
 st.markdown("<h2 class='sub-header'>🎭 Art and Culture Showcase</h2>", unsafe_allow_html=True)
 
 # Top art forms across India
-art_form_agg = filtered_df.groupby('art_form').agg({
-    'tourist_visits': 'sum',
-    'funding_received': 'sum'
-}).reset_index()
+art_form_agg = exact_summary['art_form_agg']
 
-top_art_forms = art_form_agg.sort_values('tourist_visits', ascending=False).head(10)
+top_art_forms = exact_summary['top_art_forms']
 
 col1, col2 = st.columns([3, 2])
 
@@ -694,7 +1758,7 @@ with col1:
         yaxis_title=None
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
@@ -728,7 +1792,7 @@ with col2:
         legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
 
 # Seasonal Analysis
@@ -766,23 +1830,27 @@ with col1:
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.subheader("Peak Tourism Months by Region")
     
-    # Calculate the month with maximum tourists for each region
-    peak_months = monthly_region.loc[monthly_region.groupby('region')['tourist_visits'].idxmax()]
+    # Peak month from the multi-year seasonal component rather than a single year's maximum
+    peak_months = seasonal_decomposition['peaks']
+    peak_months = peak_months[peak_months['level'] == 'Region'].rename(columns={'name': 'region'})
+    peak_months['month_name'] = peak_months['peak_month'].map(month_dict)
     
     # Create the chart
     fig = px.bar(
         peak_months,
         x='region',
-        y='tourist_visits',
+        y='peak_visits',
         color='month_name',
-        labels={'tourist_visits': 'Peak Monthly Visits', 'region': 'Region', 'month_name': 'Month'},
+        hover_data={'peak_season': True, 'seasonal_strength': ':.2f'},
+        labels={'peak_visits': 'Typical Peak Monthly Visits', 'region': 'Region', 'month_name': 'Month',
+                'peak_season': 'Peak Season', 'seasonal_strength': 'Seasonality Strength'},
         height=400
     )
     
@@ -792,9 +1860,84 @@ with col2:
         yaxis_title="Tourist Visits",
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     st.markdown("</div>", unsafe_allow_html=True)
 
+st.markdown("<div class='card'>", unsafe_allow_html=True)
+st.subheader("Seasonal Decomposition")
+
+col1, col2 = st.columns([1, 3])
+
+with col1:
+    decomposition_level = st.radio("Series", ["Region", "State"], horizontal=True)
+    decomposition_names = sorted(
+        seasonal_decomposition['peaks'].loc[seasonal_decomposition['peaks']['level'] == decomposition_level, 'name']
+    )
+    decomposition_name = st.selectbox(f"Select {decomposition_level.lower()}", decomposition_names)
+
+    peak = seasonal_decomposition['peaks']
+    peak = peak[(peak['level'] == decomposition_level) & (peak['name'] == decomposition_name)].iloc[0]
+    st.metric(label="Peak Season", value=peak['peak_season'])
+    st.metric(label="Peak Month", value=month_dict.get(peak['peak_month'], '-'))
+    st.metric(label="Seasonality Strength", value=f"{peak['seasonal_strength']:.2f}")
+
+with col2:
+    components = seasonal_decomposition['components']
+    components = components[(components['level'] == decomposition_level) & (components['name'] == decomposition_name)]
+
+    fig = px.line(
+        components,
+        x='date',
+        y='value',
+        facet_row='component',
+        category_orders={'component': ['Observed', 'Trend', 'Seasonal', 'Residual']},
+        labels={'value': '', 'date': ''},
+        height=600
+    )
+
+    fig.update_yaxes(matches=None)
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split('=')[-1]))
+    fig.update_layout(margin=dict(l=0, r=0, t=10, b=0))
+
+    show_chart(fig)
+
+st.markdown("</div>", unsafe_allow_html=True)
+
+# Anomalies
+st.markdown("---")
+st.markdown("<h2 class='sub-header'>🚨 Unusual Months</h2>", unsafe_allow_html=True)
+
+region_states = df.groupby('state')['region'].first()
+year_anomalies = anomalies[(anomalies['year'] == selected_year) &
+                           (anomalies['state'].map(region_states).isin(selected_region))]
+
+if year_anomalies.empty:
+    st.info(f"No unusual months in {selected_year} at a threshold of {anomaly_threshold}")
+else:
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.metric(label=f"Flagged Points in {selected_year}", value=len(year_anomalies))
+        st.metric(label="States Affected", value=year_anomalies['state'].nunique())
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        anomaly_table = year_anomalies.assign(
+            month=year_anomalies['month'].map(month_dict),
+            direction=np.where(year_anomalies['score'] > 0, 'Spike', 'Drop')
+        ).sort_values('score', key=lambda scores: scores.abs(), ascending=False)
+
+        st.dataframe(
+            anomaly_table[['state', 'art_form', 'month', 'direction', 'tourist_visits', 'expected_visits', 'score']].rename(columns={
+                'state': 'State', 'art_form': 'Art Form', 'month': 'Month', 'direction': 'Direction',
+                'tourist_visits': 'Visits', 'expected_visits': 'Expected', 'score': 'Score'
+            }).round({'Score': 1}),
+            hide_index=True,
+            use_container_width=True,
+            height=300
+        )
+
 # Download the data
 st.markdown("---")
 st.markdown("<h2 class='sub-header'>📊 Data Export</h2>", unsafe_allow_html=True)
@@ -802,12 +1945,10 @@ st.markdown("<h2 class='sub-header'>📊 Data Export</h2>", unsafe_allow_html=Tr
 col1, col2 = st.columns(2)
 
 with col1:
-    # Convert dataframe to CSV for download
-    @st.cache_data
-    def convert_df_to_csv(df):
-        return df.to_csv(index=False).encode('utf-8')
+    # Convert the filtered rows to CSV only when a download is requested
+    def csv():
+        return filter_rows(df, filter_cube, filter_cells).to_csv(index=False).encode('utf-8')
     
-    csv = convert_df_to_csv(filtered_df)
     st.download_button(
         label="Download Current View as CSV",
         data=csv,
@@ -840,10 +1981,7 @@ with tab1:
     st.subheader("Correlation Between Tourism and Cultural Funding")
     
     # Calculate correlation metrics
-    state_corr = filtered_df.groupby('state').agg({
-        'tourist_visits': 'sum',
-        'funding_received': 'sum'
-    }).reset_index()
+    state_corr = state_agg
     
     correlation = state_corr['tourist_visits'].corr(state_corr['funding_received'])
     
@@ -876,7 +2014,7 @@ with tab1:
         ]
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     # Explanation
     st.markdown(f"""
@@ -936,7 +2074,7 @@ with tab2:
             margin=dict(l=0, r=0, t=10, b=0)
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
         
         # Add insights
         funding_growth_corr = growth_data['funding_prev_per_visitor'].corr(growth_data['visit_growth_pct'])
@@ -999,7 +2137,7 @@ with tab3:
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     # Add forecast metrics
     last_actual = yearly_total['tourist_visits'].iloc[-1]
@@ -1036,6 +2174,8 @@ with tab3:
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+filter_status.empty()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,199 @@
+# Out-of-core aggregation of the tourism fact table under a memory budget.
+#
+# The fact table is streamed in chunks (from a Parquet file or directory, a
+# CSV file, or a warehouse cursor, whose batches are re-sliced) sized so each
+# chunk stays within a share of the budget. Every chunk is reduced to partial sums at the dashboard grain
+# (year, month, region, state, art_form) and the partials are combined, so the
+# result is a compact table with the same columns as the raw facts no matter
+# how long the history is. A result too large for the budget stops the run
+# with a MemoryError instead of silently overrunning it.
+#
+#     python chunked_aggregation.py history/ --budget-mb 512 --output compact.parquet
+
+import argparse
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+GRAIN = ['year', 'month', 'region', 'state', 'art_form']
+MEASURES = ['tourist_visits', 'funding_received']
+
+# Memory budget for aggregation, overridable through the environment
+DEFAULT_BUDGET_BYTES = int(float(os.environ.get('MEMORY_BUDGET_MB', 1024)) * 1024 * 1024)
+
+# Share of the budget given to one raw chunk; the rest holds partials and the result
+CHUNK_BUDGET_SHARE = 0.25
+
+# Rows read to estimate the in-memory size of a row
+PROBE_ROWS = 10000
+
+# Partials are re-compacted only once they have grown this many times past the last compacted size
+COMPACTION_GROWTH = 2
+
+
+# Function to estimate pandas bytes per row from a sample
+def bytes_per_row(sample):
+    if len(sample) == 0:
+        return 1
+    return max(int(sample.memory_usage(deep=True).sum() / len(sample)), 1)
+
+
+# Function to size chunks so one chunk uses at most its share of the budget
+def rows_per_chunk(row_bytes, budget_bytes=DEFAULT_BUDGET_BYTES):
+    return max(int(budget_bytes * CHUNK_BUDGET_SHARE / row_bytes), 1000)
+
+
+# Function to reduce a chunk to partial sums at the dashboard grain
+def partial_aggregate(chunk):
+    chunk = chunk[GRAIN + MEASURES]
+    # Categorical keys keep the group-by small however wide the strings are
+    keys = {column: chunk[column] if pd.api.types.is_numeric_dtype(chunk[column]) else chunk[column].astype('category')
+            for column in GRAIN}
+    grouped = chunk[MEASURES].groupby([keys[column] for column in GRAIN], observed=True, sort=False)
+    return grouped.sum().reset_index()
+
+
+# Function to merge partial aggregates into one
+def combine_partials(partials):
+    combined = pd.concat(partials, ignore_index=True)
+    for column in GRAIN:
+        if isinstance(combined[column].dtype, pd.CategoricalDtype):
+            combined[column] = combined[column].astype(combined[column].cat.categories.dtype)
+    return combined.groupby(GRAIN, sort=False)[MEASURES].sum().reset_index()
+
+
+# Function to aggregate a stream of DataFrame chunks, compacting partials whenever they outgrow the budget
+def aggregate_chunks(chunks, budget_bytes=DEFAULT_BUDGET_BYTES, stats=None):
+    partials, partial_bytes = [], 0
+    stats = {} if stats is None else stats
+    stats.update(chunks=0, rows=0, peak_partial_bytes=0, compactions=0)
+
+    # Partials and the result get what one raw chunk does not use
+    partial_budget = budget_bytes * (1 - CHUNK_BUDGET_SHARE)
+    compact_at = budget_bytes * CHUNK_BUDGET_SHARE
+
+    for chunk in chunks:
+        chunk.columns = [column.lower() for column in chunk.columns]
+        partial = partial_aggregate(chunk)
+        partials.append(partial)
+        partial_bytes += partial.memory_usage(deep=True).sum()
+        stats['chunks'] += 1
+        stats['rows'] += len(chunk)
+        stats['peak_partial_bytes'] = max(stats['peak_partial_bytes'], partial_bytes)
+
+        if partial_bytes > compact_at:
+            partials = [combine_partials(partials)]
+            partial_bytes = partials[0].memory_usage(deep=True).sum()
+            stats['compactions'] += 1
+            if partial_bytes > partial_budget:
+                raise MemoryError(
+                    f"Aggregated result ({partial_bytes / 1024 / 1024:.1f} MB) exceeds the "
+                    f"{partial_budget / 1024 / 1024:.1f} MB left for partials in the {budget_bytes / 1024 / 1024:.1f} MB "
+                    f"memory budget; raise MEMORY_BUDGET_MB or aggregate a coarser grain"
+                )
+            # Waiting for the partials to double keeps re-compaction amortised linear instead of once per chunk
+            compact_at = min(max(compact_at, COMPACTION_GROWTH * partial_bytes), partial_budget)
+
+    if not partials:
+        return pd.DataFrame(columns=GRAIN + MEASURES)
+
+    result = combine_partials(partials).sort_values(GRAIN, ignore_index=True)
+    result[['year', 'month']] = result[['year', 'month']].astype('int64')
+    stats['result_rows'] = len(result)
+    return result
+
+
+# Function to stream a Parquet file or (hive-partitioned) directory in budget-sized chunks
+def iter_parquet_chunks(path, budget_bytes=DEFAULT_BUDGET_BYTES):
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    columns = [column for column in GRAIN + MEASURES if column in dataset.schema.names]
+    batch_size = rows_per_chunk(bytes_per_row(dataset.head(PROBE_ROWS, columns=columns).to_pandas()), budget_bytes)
+    # Partitioned datasets yield many small fragment batches; coalesce them up to the chunk size
+    pending, pending_rows = [], 0
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= batch_size:
+            yield pa.Table.from_batches(pending).to_pandas()
+            pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+# Function to stream a CSV file in budget-sized chunks
+def iter_csv_chunks(path, budget_bytes=DEFAULT_BUDGET_BYTES):
+    chunksize = rows_per_chunk(bytes_per_row(pd.read_csv(path, nrows=PROBE_ROWS)), budget_bytes)
+    with pd.read_csv(path, usecols=lambda column: column.lower() in GRAIN + MEASURES, chunksize=chunksize) as reader:
+        yield from reader
+
+
+# Function to re-slice DataFrame batches whose size the source decides (e.g. a warehouse cursor)
+# into budget-sized chunks
+def iter_budget_chunks(batches, budget_bytes=DEFAULT_BUDGET_BYTES):
+    chunk_rows = None
+    pending, pending_rows = [], 0
+    for batch in batches:
+        if chunk_rows is None:
+            chunk_rows = rows_per_chunk(bytes_per_row(batch.head(PROBE_ROWS)), budget_bytes)
+        start = 0
+        while start < len(batch):
+            piece = batch.iloc[start:start + chunk_rows - pending_rows]
+            start += len(piece)
+            pending.append(piece)
+            pending_rows += len(piece)
+            if pending_rows >= chunk_rows:
+                yield pd.concat(pending, ignore_index=True)
+                pending, pending_rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+# Function to pick the chunk reader for a local fact file
+def iter_file_chunks(path, budget_bytes=DEFAULT_BUDGET_BYTES):
+    if path.endswith('.csv'):
+        return iter_csv_chunks(path, budget_bytes)
+    return iter_parquet_chunks(path, budget_bytes)
+
+
+# Function to aggregate a local fact file (CSV, Parquet file or Parquet directory)
+def aggregate_file(path, budget_bytes=DEFAULT_BUDGET_BYTES, stats=None):
+    return aggregate_chunks(iter_file_chunks(path, budget_bytes), budget_bytes, stats)
+
+
+# Function to identify a local fact file version (path + size + newest mtime) without reading it
+def file_version(path):
+    if os.path.isdir(path):
+        files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        stats = [os.stat(name) for name in files]
+        return f"{os.path.abspath(path)}:{len(files)}:{sum(s.st_size for s in stats)}:{max((s.st_mtime_ns for s in stats), default=0)}"
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a tourism fact file to the dashboard grain under a memory budget")
+    parser.add_argument('source', help="CSV file, Parquet file or Parquet directory")
+    parser.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET_BYTES / 1024 / 1024)
+    parser.add_argument('--output', help="Write the compact table to this Parquet or CSV file")
+    args = parser.parse_args()
+
+    stats = {}
+    started = time.perf_counter()
+    result = aggregate_file(args.source, int(args.budget_mb * 1024 * 1024), stats)
+    elapsed = time.perf_counter() - started
+
+    print(f"{stats['rows']:,} rows in {stats['chunks']} chunks -> {len(result):,} grain rows "
+          f"in {elapsed:.1f}s (peak partials {stats['peak_partial_bytes'] / 1024 / 1024:.1f} MB)")
+
+    if args.output:
+        if args.output.endswith('.csv'):
+            result.to_csv(args.output, index=False)
+        else:
+            result.to_parquet(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# Incrementally maintained aggregates for the sidebar filters.
+#
+# The fact table is cut into filter cells, one per (year, region, month).
+# build_cube precomputes per-cell partial sums for every state and art form,
+# plus the table's row positions grouped by (cell, state). A filter selection
+# is then a set of cells: its totals are the sum of those cells' partials,
+# and when the selection changes maintain_filter_aggregates adds the cells
+# that were switched on and subtracts the ones switched off, so the cost
+# follows the size of the change rather than of the selection.
+#
+#     cube = build_cube(df)
+#     cells = selected_filter_cells(cube, 2024, ['South'], [1, 2, 3])
+#     aggregates = maintain_filter_aggregates(cube, fingerprint, cells, st.session_state)
+
+import numpy as np
+import pandas as pd
+
+# Measures kept per filter cell: summed visits, summed funding and row count
+CUBE_MEASURES = ['tourist_visits', 'funding_received', 'rows']
+
+
+# Function to precompute partial aggregates for every (year, region, month) filter cell
+def build_cube(df):
+    years = np.sort(df['year'].unique())
+    regions = np.sort(df['region'].unique())
+    states = np.sort(df['state'].unique())
+    art_forms = np.sort(df['art_form'].unique())
+
+    # Cell id = (year, region, month) flattened
+    year_idx = pd.Categorical(df['year'], categories=years).codes.astype(np.int64)
+    region_idx = pd.Categorical(df['region'], categories=regions).codes.astype(np.int64)
+    month_idx = df['month'].to_numpy().astype(np.int64) - 1
+    cell_idx = (year_idx * len(regions) + region_idx) * 12 + month_idx
+    n_cells = len(years) * len(regions) * 12
+
+    integer_measures = all(pd.api.types.is_integer_dtype(df[column]) for column in CUBE_MEASURES[:2])
+    dtype = np.int64 if integer_measures else np.float64
+
+    # Partial aggregates per (cell, member) for each dimension
+    def cell_totals(dimension, members):
+        member_idx = pd.Categorical(df[dimension], categories=members).codes.astype(np.int64)
+        flat_idx = cell_idx * len(members) + member_idx
+        totals = np.zeros((n_cells, len(members), len(CUBE_MEASURES)), dtype=dtype)
+        for k, column in enumerate(CUBE_MEASURES):
+            weights = None if column == 'rows' else df[column].to_numpy()
+            counts = np.bincount(flat_idx, weights=weights, minlength=n_cells * len(members))
+            totals[:, :, k] = counts.reshape(n_cells, len(members))
+        return totals
+
+    # Row positions grouped by (cell, state), so a selection, or one state within it, is a set of slices
+    state_idx = pd.Categorical(df['state'], categories=states).codes.astype(np.int64)
+    group_idx = cell_idx * len(states) + state_idx
+    row_order = np.argsort(group_idx, kind='stable')
+    group_bounds = np.searchsorted(group_idx[row_order], np.arange(n_cells * len(states) + 1))
+
+    return {
+        'year_pos': {year: i for i, year in enumerate(years)},
+        'region_pos': {region: i for i, region in enumerate(regions)},
+        'state_pos': {state: i for i, state in enumerate(states)},
+        'n_regions': len(regions),
+        'states': states,
+        'art_forms': art_forms,
+        'state_cells': cell_totals('state', states),
+        'art_form_cells': cell_totals('art_form', art_forms),
+        'row_order': row_order,
+        'group_bounds': group_bounds,
+        'locations': df.groupby('state')[['latitude', 'longitude']].first().reset_index()
+    }
+
+
+# Function to list the filter cells selected by the sidebar filters
+def selected_filter_cells(cube, selected_year, selected_region, selected_months):
+    if selected_year not in cube['year_pos']:
+        return frozenset()
+    year_pos = cube['year_pos'][selected_year]
+    return frozenset(
+        (year_pos * cube['n_regions'] + cube['region_pos'][region]) * 12 + (month - 1)
+        for region in selected_region if region in cube['region_pos']
+        for month in selected_months
+    )
+
+
+# Function to sum the partial aggregates of a set of cells
+def sum_cells(cube, cells):
+    cells = sorted(cells)
+    return (cube['state_cells'][cells].sum(axis=0),
+            cube['art_form_cells'][cells].sum(axis=0))
+
+
+# Function to keep the filtered aggregates up to date by adding/subtracting only the changed cells
+def maintain_filter_aggregates(cube, fingerprint, cells, store, prewarmed=None):
+    current = store.get('filter_aggregates')
+
+    if prewarmed and cells in prewarmed:
+        # Popular selections are summed ahead of time by the background refresh
+        state_totals, art_form_totals = prewarmed[cells]
+    elif current is None or current['fingerprint'] != fingerprint or len(cells ^ current['cells']) >= len(cells):
+        # Nothing to build on (or the change is bigger than the new selection)
+        state_totals, art_form_totals = sum_cells(cube, cells)
+    else:
+        added_state, added_art_form = sum_cells(cube, cells - current['cells'])
+        removed_state, removed_art_form = sum_cells(cube, current['cells'] - cells)
+        state_totals = current['state_totals'] + added_state - removed_state
+        art_form_totals = current['art_form_totals'] + added_art_form - removed_art_form
+
+    store['filter_aggregates'] = {
+        'fingerprint': fingerprint,
+        'cells': cells,
+        'state_totals': state_totals,
+        'art_form_totals': art_form_totals
+    }
+    return store['filter_aggregates']
+
+
+# Function to slice the rows of the selected cells (optionally one state's) without scanning the whole table
+def filter_rows(df, cube, cells, state=None):
+    n_states = len(cube['states'])
+    if state is None:
+        groups = [(cell * n_states, (cell + 1) * n_states) for cell in sorted(cells)]
+    elif state in cube['state_pos']:
+        groups = [(cell * n_states + cube['state_pos'][state], cell * n_states + cube['state_pos'][state] + 1)
+                  for cell in sorted(cells)]
+    else:
+        groups = []
+
+    bounds = cube['group_bounds']
+    positions = [cube['row_order'][bounds[start]:bounds[end]] for start, end in groups]
+    if not positions:
+        return df.iloc[0:0]
+    return df.iloc[np.sort(np.concatenate(positions))]
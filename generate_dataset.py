@@ -0,0 +1,141 @@
+# Parallel synthetic dataset generator for load tests.
+#
+# Uses the same tourism model as the dashboard's mock data (tourism_model.py)
+# to write a hive-partitioned Parquet dataset, one year=/month= directory per
+# partition. Partitions are generated by worker processes, each from its own
+# seed derived from (seed, year, month), so the output does not depend on the
+# number of workers. Rows are written in fixed-size files as they are
+# generated; no process holds more than one file's rows at a time.
+#
+#     python generate_dataset.py data/tourism_100m --rows 100000000 --workers 8
+#     FACT_TABLE_PATH=data/tourism_100m OUT_OF_CORE=1 streamlit run app.py
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from seasonality import available_cpus
+from tourism_model import ART_FORMS, POPULARITY_FACTOR, SEASONAL_MULTIPLIERS, STATE_TO_REGION, STATES, YEARLY_GROWTH
+
+DEFAULT_ROWS_PER_FILE = 1000000
+
+# Per-state model parameters as arrays, indexed like STATES
+STATE_REGIONS = [STATE_TO_REGION.get(state, 'Other') for state in STATES]
+STATE_POPULARITY = np.array([POPULARITY_FACTOR.get(state, 1.0) for state in STATES])
+STATE_ART_FORMS = [ART_FORMS.get(state, ["Traditional Dance"]) for state in STATES]
+
+# Art form dictionary, and each state's codes into it (padded to the longest list)
+ART_FORM_NAMES = sorted({art_form for forms in STATE_ART_FORMS for art_form in forms})
+ART_FORM_COUNTS = np.array([len(forms) for forms in STATE_ART_FORMS])
+ART_FORM_CODES = np.zeros((len(STATES), ART_FORM_COUNTS.max()), dtype=np.int16)
+for s, forms in enumerate(STATE_ART_FORMS):
+    ART_FORM_CODES[s, :len(forms)] = [ART_FORM_NAMES.index(art_form) for art_form in forms]
+REGION_NAMES = sorted(set(STATE_REGIONS))
+REGION_CODES = np.array([REGION_NAMES.index(region) for region in STATE_REGIONS])
+
+SCHEMA = pa.schema([
+    ('state', pa.dictionary(pa.int8(), pa.string())),
+    ('art_form', pa.dictionary(pa.int16(), pa.string())),
+    ('tourist_visits', pa.int64()),
+    ('region', pa.dictionary(pa.int8(), pa.string())),
+    ('funding_received', pa.int64())
+])
+
+
+# Function to round to integers without bias: up with probability equal to the fraction
+def stochastic_round(rng, values):
+    values = np.clip(values, 0, None)
+    whole = np.floor(values)
+    return (whole + (rng.random(len(values)) < values - whole)).astype(np.int64)
+
+
+# Function to generate one block of rows for a (year, month) partition
+def generate_block(rng, year, month, n_rows, records_per_state):
+    # Rows cycle through the states so every state gets its share of each partition
+    state_idx = np.arange(n_rows) % len(STATES)
+    seasonal = np.array([SEASONAL_MULTIPLIERS.get(region, [1.0] * 12)[month - 1] for region in STATE_REGIONS])
+    year_factor = YEARLY_GROWTH.get(year, 1.0)
+
+    # Same distributions as generate_mock_data, scaled so a state's monthly total keeps the mock magnitude.
+    # At large row counts a row carries only a few visits, so truncating would lose a large share of them
+    base_visits = rng.gamma(shape=10, scale=STATE_POPULARITY[state_idx] * 10000) / records_per_state
+    tourist_visits = stochastic_round(rng, base_visits * seasonal[state_idx] * year_factor * (1 + rng.normal(0, 0.1, n_rows)))
+    funding_base = tourist_visits * rng.uniform(0.5, 2.0, n_rows)
+    funding_received = stochastic_round(rng, funding_base * (1 + rng.normal(0, 0.2, n_rows)))
+
+    # Random art form among the state's own
+    choice = rng.integers(0, 1 << 30, n_rows) % ART_FORM_COUNTS[state_idx]
+    art_form_idx = ART_FORM_CODES[state_idx, choice]
+
+    return pa.Table.from_arrays([
+        pa.DictionaryArray.from_arrays(pa.array(state_idx.astype(np.int8)), pa.array(STATES)),
+        pa.DictionaryArray.from_arrays(pa.array(art_form_idx), pa.array(ART_FORM_NAMES)),
+        pa.array(tourist_visits),
+        pa.DictionaryArray.from_arrays(pa.array(REGION_CODES[state_idx].astype(np.int8)), pa.array(REGION_NAMES)),
+        pa.array(funding_received)
+    ], schema=SCHEMA)
+
+
+# Function to write one (year, month) partition as a series of Parquet files
+def write_partition(output, year, month, n_rows, seed, rows_per_file=DEFAULT_ROWS_PER_FILE):
+    rng = np.random.default_rng([seed, year, month])
+    directory = os.path.join(output, f"year={year}", f"month={month}")
+    os.makedirs(directory, exist_ok=True)
+    records_per_state = max(n_rows / len(STATES), 1)
+
+    written, part = 0, 0
+    while written < n_rows:
+        n_block = min(rows_per_file, n_rows - written)
+        table = generate_block(rng, year, month, n_block, records_per_state)
+        path = os.path.join(directory, f"part-{part:05d}.parquet")
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        written += n_block
+        part += 1
+
+    return year, month, written
+
+
+# Function to spread the total row count over the partitions
+def partition_sizes(n_rows, partitions):
+    base, extra = divmod(n_rows, len(partitions))
+    return [base + (i < extra) for i in range(len(partitions))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a partitioned synthetic tourism dataset")
+    parser.add_argument('output', help="Output directory (hive-partitioned by year and month)")
+    parser.add_argument('--rows', type=int, default=10000000, help="Total rows to generate")
+    parser.add_argument('--start-year', type=int, default=min(YEARLY_GROWTH))
+    parser.add_argument('--end-year', type=int, default=max(YEARLY_GROWTH))
+    parser.add_argument('--workers', type=int, default=available_cpus())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rows-per-file', type=int, default=DEFAULT_ROWS_PER_FILE)
+    args = parser.parse_args()
+
+    partitions = [(year, month) for year in range(args.start_year, args.end_year + 1) for month in range(1, 13)]
+    sizes = partition_sizes(args.rows, partitions)
+
+    started = time.perf_counter()
+    total = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(write_partition, args.output, year, month, n_rows, args.seed, args.rows_per_file)
+            for (year, month), n_rows in zip(partitions, sizes)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            year, month, written = future.result()
+            total += written
+            print(f"[{done}/{len(partitions)}] year={year} month={month}: {written:,} rows", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {total:,} rows to {args.output} in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
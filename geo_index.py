@@ -0,0 +1,66 @@
+# Spatial index over heritage sites for radius, k-nearest and bounding-box lookups.
+#
+#     index = HeritageSiteIndex(sites)              # DataFrame with latitude/longitude columns
+#     index.within_radius(26.91, 75.79, 50)         # sites within 50 km, nearest first
+#     index.nearest(26.91, 75.79, k=5)
+#     index.within_bbox(26.0, 75.0, 27.5, 76.5)     # min_lat, min_lon, max_lat, max_lon
+#
+# Radius and k-nearest queries use a ball tree on great-circle (haversine)
+# distance; bounding boxes use a latitude-sorted array.
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class HeritageSiteIndex:
+    def __init__(self, sites, lat_column='latitude', lon_column='longitude', leaf_size=40):
+        self.sites = sites.reset_index(drop=True)
+        self.lats = self.sites[lat_column].to_numpy(dtype=float)
+        self.lons = self.sites[lon_column].to_numpy(dtype=float)
+
+        # Ball tree on (lat, lon) in radians for haversine queries
+        self._tree = BallTree(np.radians(np.column_stack([self.lats, self.lons])),
+                              leaf_size=leaf_size, metric='haversine')
+
+        # Latitude-sorted positions for bounding-box queries
+        self._lat_order = np.argsort(self.lats, kind='stable')
+        self._sorted_lats = self.lats[self._lat_order]
+
+    def __len__(self):
+        return len(self.sites)
+
+    # Positions and distances (km) of sites within radius_km, nearest first
+    def radius_positions(self, lat, lon, radius_km):
+        positions, distances = self._tree.query_radius(
+            np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM,
+            return_distance=True, sort_results=True
+        )
+        return positions[0], distances[0] * EARTH_RADIUS_KM
+
+    # Positions and distances (km) of the k nearest sites
+    def nearest_positions(self, lat, lon, k=10):
+        k = min(k, len(self.sites))
+        distances, positions = self._tree.query(np.radians([[lat, lon]]), k=k)
+        return positions[0], distances[0] * EARTH_RADIUS_KM
+
+    # Positions of sites inside a bounding box (does not wrap across the antimeridian)
+    def bbox_positions(self, min_lat, min_lon, max_lat, max_lon):
+        start = np.searchsorted(self._sorted_lats, min_lat, side='left')
+        end = np.searchsorted(self._sorted_lats, max_lat, side='right')
+        candidates = self._lat_order[start:end]
+        lons = self.lons[candidates]
+        return np.sort(candidates[(lons >= min_lon) & (lons <= max_lon)])
+
+    def within_radius(self, lat, lon, radius_km):
+        positions, distances = self.radius_positions(lat, lon, radius_km)
+        return self.sites.iloc[positions].assign(distance_km=distances)
+
+    def nearest(self, lat, lon, k=10):
+        positions, distances = self.nearest_positions(lat, lon, k)
+        return self.sites.iloc[positions].assign(distance_km=distances)
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        return self.sites.iloc[self.bbox_positions(min_lat, min_lon, max_lat, max_lon)]
+
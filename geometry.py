@@ -0,0 +1,181 @@
+# Pre-simplified, cached boundary geometry for choropleth maps.
+#
+# A source GeoJSON (path or URL) is simplified once per detail level,
+# quantised and stored as a compact .npz keyed by the source version. Minimal
+# GeoJSON files (feature id + coordinates only) are then written under
+# Streamlit's static directory so the browser fetches each level once by URL
+# and every rerun only sends the feature ids and metric values.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import requests
+
+# Simplification tolerance (degrees) per detail level
+DETAIL_LEVELS = {'low': 0.05, 'medium': 0.01, 'high': 0.002}
+
+# Quantisation step: 1e-5 degrees (~1 m)
+COORDINATE_SCALE = 100000
+
+CACHE_DIR = os.path.join('.cache', 'geometry')
+STATIC_DIR = os.path.join('static', 'geo')
+STATIC_URL = 'app/static/geo'
+
+
+# Function to read GeoJSON bytes from a file path or URL
+def read_source(source):
+    if source.startswith(('http://', 'https://')):
+        response = requests.get(source, timeout=60)
+        response.raise_for_status()
+        return response.content
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+# Function to simplify a ring with the Douglas-Peucker algorithm
+def simplify_ring(points, tolerance):
+    n = len(points)
+    if n <= 4:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        a, b = points[start], points[end]
+        segment = points[start + 1:end]
+        direction = b - a
+        length = np.hypot(*direction)
+        if length == 0:
+            distances = np.hypot(*(segment - a).T)
+        else:
+            distances = np.abs(direction[0] * (segment[:, 1] - a[1]) - direction[1] * (segment[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            keep[start + 1 + farthest] = True
+            stack.append((start, start + 1 + farthest))
+            stack.append((start + 1 + farthest, end))
+
+    return points[keep]
+
+
+# Function to list a feature's polygons as lists of rings
+def feature_polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+# Function to simplify and quantise every feature at one detail level
+def pack_level(features, tolerance):
+    coords, ring_offsets, polygon_offsets, feature_offsets = [], [0], [0], [0]
+
+    for feature in features:
+        for polygon in feature_polygons(feature.get('geometry')):
+            for ring_number, ring in enumerate(polygon):
+                simplified = simplify_ring(np.asarray(ring, dtype=float)[:, :2], tolerance)
+                if len(simplified) < 4:
+                    # Holes and islands smaller than the tolerance are dropped; outer rings keep a triangle
+                    if ring_number > 0 or len(ring) < 4:
+                        continue
+                    ring = np.asarray(ring, dtype=float)[:, :2]
+                    simplified = ring[[0, len(ring) // 3, 2 * len(ring) // 3, 0]]
+                coords.append(np.rint(simplified * COORDINATE_SCALE).astype(np.int32))
+                ring_offsets.append(ring_offsets[-1] + len(simplified))
+            polygon_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(polygon_offsets) - 1)
+
+    return {
+        'coords': np.concatenate(coords) if coords else np.zeros((0, 2), dtype=np.int32),
+        'ring_offsets': np.asarray(ring_offsets, dtype=np.int64),
+        'polygon_offsets': np.asarray(polygon_offsets, dtype=np.int64),
+        'feature_offsets': np.asarray(feature_offsets, dtype=np.int64)
+    }
+
+
+# Function to identify a source version without downloading it (URL, or path + size + mtime)
+def source_key(source, id_property, rename, levels):
+    identity = source
+    if not source.startswith(('http://', 'https://')):
+        stat = os.stat(source)
+        identity = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+    payload = json.dumps([identity, id_property, rename or {}, levels], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+# Function to build (or load) the compact geometry cache for a source
+def load_geometry_cache(source, id_property, rename=None, levels=DETAIL_LEVELS, cache_dir=CACHE_DIR):
+    key = source_key(source, id_property, rename, levels)
+    cache_path = os.path.join(cache_dir, f"{key}.npz")
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return key, {name: cached[name] for name in cached.files}
+
+    features = json.loads(read_source(source))['features']
+    ids = [str(feature.get('properties', {}).get(id_property, '')) for feature in features]
+    ids = [(rename or {}).get(feature_id, feature_id) for feature_id in ids]
+
+    arrays = {'ids': np.asarray(ids)}
+    for level, tolerance in levels.items():
+        for name, values in pack_level(features, tolerance).items():
+            arrays[f"{level}_{name}"] = values
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(cache_path, **arrays)
+    return key, arrays
+
+
+# Function to rebuild a minimal GeoJSON FeatureCollection for one detail level
+def level_to_geojson(arrays, level):
+    coords = arrays[f"{level}_coords"] / COORDINATE_SCALE
+    ring_offsets = arrays[f"{level}_ring_offsets"]
+    polygon_offsets = arrays[f"{level}_polygon_offsets"]
+    feature_offsets = arrays[f"{level}_feature_offsets"]
+
+    features = []
+    for f, feature_id in enumerate(arrays['ids']):
+        polygons = []
+        for p in range(feature_offsets[f], feature_offsets[f + 1]):
+            rings = [np.round(coords[ring_offsets[r]:ring_offsets[r + 1]], 5).tolist()
+                     for r in range(polygon_offsets[p], polygon_offsets[p + 1])]
+            if rings:
+                polygons.append(rings)
+        if polygons:
+            features.append({
+                'type': 'Feature',
+                'id': str(feature_id),
+                'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}
+            })
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+# Function to publish each detail level as a static file; returns {level: url}
+def prepare_static_geometry(source, id_property, layer='states', rename=None, levels=DETAIL_LEVELS,
+                            cache_dir=CACHE_DIR, static_dir=STATIC_DIR, static_url=STATIC_URL):
+    key, arrays = load_geometry_cache(source, id_property, rename, levels, cache_dir)
+    os.makedirs(static_dir, exist_ok=True)
+
+    urls = {}
+    for level in levels:
+        # The source version is part of the name, so browsers can cache each file indefinitely
+        filename = f"{layer}_{level}_{key}.geojson"
+        path = os.path.join(static_dir, filename)
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'w') as f:
+                json.dump(level_to_geojson(arrays, level), f, separators=(',', ':'))
+            os.replace(path + '.tmp', path)
+        urls[level] = f"{static_url}/{filename}"
+
+    return urls
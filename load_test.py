@@ -0,0 +1,253 @@
+# Concurrent-session load test for the dashboard, without a browser.
+#
+# Each simulated session is a streamlit.testing AppTest driven through a
+# scripted mix of interactions (change year, toggle regions, change months,
+# pick a state, export). All sessions run in this process, so they share the
+# st.cache_data / st.cache_resource caches the way sessions of one server
+# process do. For every concurrency level the harness reports p50/p95/p99
+# rerun latency, throughput and peak RSS, and saves the results as JSON.
+#
+#     python load_test.py --sessions 1,4,8 --steps 20 --output results.json
+#     python load_test.py --sessions 1,4,8 --steps 20 --baseline results.json
+#
+# Tabs are not exercised separately: Streamlit renders every tab on each run.
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+RUN_TIMEOUT = 300
+
+# Relative frequency of each interaction in a session script
+ACTION_WEIGHTS = {
+    'change_year': 3,
+    'toggle_region': 3,
+    'change_months': 2,
+    'pick_state': 3,
+    'export': 1
+}
+
+# Interactions that edit the sidebar filter panel
+FILTER_ACTIONS = {'change_year', 'toggle_region', 'change_months'}
+
+PERCENTILES = [50, 95, 99]
+
+
+# Function to find a widget by its label
+def find_widget(at, kind, label):
+    for widget in getattr(at, kind):
+        if widget.label.startswith(label):
+            return widget
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+# Function to apply one interaction to a session (the caller reruns it)
+def apply_action(at, action, rng):
+    if action == 'change_year':
+        year = find_widget(at, 'selectbox', "Select Year")
+        year.set_value(rng.choice(year.options))
+    elif action == 'toggle_region':
+        regions = find_widget(at, 'multiselect', "Filter by Region")
+        region = rng.choice(regions.options)
+        if region in regions.value and len(regions.value) > 1:
+            regions.unselect(region)
+        else:
+            regions.select(region)
+    elif action == 'change_months':
+        months = find_widget(at, 'multiselect', "Select Months")
+        start = rng.randrange(12)
+        months.set_value([(start + offset) % 12 + 1 for offset in range(rng.randint(1, 12))])
+    elif action == 'pick_state':
+        state = find_widget(at, 'selectbox', "Select a state to explore")
+        state.set_value(rng.choice(state.options))
+    elif action == 'export':
+        find_widget(at, 'button', "Generate Detailed Excel Report").click()
+
+    # Sidebar filters in apply mode only take effect when the form is submitted
+    if action in FILTER_ACTIONS:
+        for button in at.button:
+            if button.label == "Apply filters":
+                button.click()
+
+
+# Function to drive one session through its script, recording (action, seconds, ok) per rerun
+def run_session(session_id, steps, seed, think_time, results):
+    rng = random.Random(seed * 100003 + session_id)
+    actions, weights = zip(*ACTION_WEIGHTS.items())
+    at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+
+    for step in range(steps + 1):
+        action = 'initial_load' if step == 0 else rng.choices(actions, weights)[0]
+        try:
+            if step > 0:
+                apply_action(at, action, rng)
+            started = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - started
+            results.append((action, elapsed, not at.exception))
+        except Exception:
+            results.append((action, None, False))
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+
+# Function to read the current resident set size in bytes
+def current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # No /proc: fall back to the process-lifetime peak (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# Sampler thread tracking the peak RSS while a concurrency level runs
+class RssMonitor(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+# Function to summarise latencies in milliseconds
+def latency_summary(latencies):
+    if not latencies:
+        return {'count': 0}
+    values = np.asarray(latencies) * 1000
+    summary = {f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary.update(count=len(values), mean_ms=float(values.mean()), max_ms=float(values.max()))
+    return summary
+
+
+# Function to run N concurrent sessions and summarise them
+def run_level(n_sessions, steps, seed, think_time):
+    results = []
+    monitor = RssMonitor()
+    monitor.start()
+    started = time.perf_counter()
+
+    threads = [
+        threading.Thread(target=run_session, args=(session_id, steps, seed, think_time, results))
+        for session_id in range(n_sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - started
+    peak_rss = monitor.stop()
+
+    ok = [(action, elapsed) for action, elapsed, success in results if success]
+    # The first load of a session is reported on its own; it is dominated by cold caches
+    reruns = [elapsed for action, elapsed in ok if action != 'initial_load']
+
+    return {
+        'sessions': n_sessions,
+        'reruns': len(results),
+        'errors': sum(not success for _, _, success in results),
+        'wall_s': wall,
+        'throughput_rps': len(ok) / wall if wall else 0.0,
+        'peak_rss_mb': peak_rss / 1024 / 1024,
+        'latency': latency_summary(reruns),
+        'initial_load': latency_summary([elapsed for action, elapsed in ok if action == 'initial_load']),
+        'by_action': {
+            action: latency_summary([elapsed for name, elapsed in ok if name == action])
+            for action in ACTION_WEIGHTS
+        }
+    }
+
+
+# Function to compare p95 latency and peak RSS with a baseline; returns the regressions found
+def compare_with_baseline(levels, baseline, tolerance):
+    previous = {level['sessions']: level for level in baseline['levels']}
+    regressions = []
+    for level in levels:
+        before = previous.get(level['sessions'])
+        if before is None:
+            continue
+        for name, now, then in [
+            ('p95 latency', level['latency'].get('p95_ms'), before['latency'].get('p95_ms')),
+            ('peak RSS', level['peak_rss_mb'], before['peak_rss_mb'])
+        ]:
+            if now is None or not then:
+                continue
+            change = now / then - 1
+            print(f"  {level['sessions']:>3} sessions  {name:<12} {then:10.1f} -> {now:10.1f}  ({change:+.1%})")
+            if change > tolerance:
+                regressions.append(f"{level['sessions']} sessions: {name} {change:+.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless concurrent-session load test for app.py")
+    parser.add_argument('--sessions', default='1,2,4,8', help="Comma-separated concurrency levels")
+    parser.add_argument('--steps', type=int, default=10, help="Interactions per session after the first load")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Mean pause between interactions (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare with a previous results file")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression vs the baseline")
+    args = parser.parse_args()
+
+    levels = []
+    for n_sessions in [int(value) for value in args.sessions.split(',')]:
+        level = run_level(n_sessions, args.steps, args.seed, args.think_time)
+        latency = level['latency']
+        print(f"{n_sessions:>3} sessions: {level['reruns']} reruns, {level['errors']} errors, "
+              f"p50 {latency.get('p50_ms', 0):.0f} ms, p95 {latency.get('p95_ms', 0):.0f} ms, "
+              f"p99 {latency.get('p99_ms', 0):.0f} ms, {level['throughput_rps']:.2f} reruns/s, "
+              f"peak RSS {level['peak_rss_mb']:.0f} MB", flush=True)
+        levels.append(level)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': vars(args),
+        'environment': {
+            'python': platform.python_version(),
+            'streamlit': streamlit.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'levels': levels
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline}:")
+        regressions = compare_with_baseline(levels, baseline, args.tolerance)
+        if regressions:
+            print("Regressions beyond tolerance:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+# Local stand-in for snowflake.connector backed by an embedded SQLite database.
+#
+# Implements the part of the connector surface the dashboard uses (connect,
+# cursor, execute, fetch_pandas_all, fetch_pandas_batches) with optional
+# latency, bandwidth and error injection so the warehouse path can be
+# exercised and load-tested offline.
+#
+# Run the dashboard against it:
+#     python local_snowflake.py load tourism_data export.csv
+#     SNOWFLAKE_CONNECTOR=local streamlit run app.py
+#
+# Benchmark the warehouse path:
+#     python local_snowflake.py bench --query-latency 0.2 --bandwidth 5e6 --runs 5
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+import pandas as pd
+
+# Defaults, overridable per connection or through the environment
+DEFAULT_PATH = os.environ.get('LOCAL_SNOWFLAKE_PATH', 'local_snowflake.db')
+DEFAULT_CONNECT_LATENCY = float(os.environ.get('LOCAL_SNOWFLAKE_CONNECT_LATENCY', 0))
+DEFAULT_QUERY_LATENCY = float(os.environ.get('LOCAL_SNOWFLAKE_QUERY_LATENCY', 0))
+DEFAULT_BANDWIDTH = float(os.environ.get('LOCAL_SNOWFLAKE_BANDWIDTH', 0))  # bytes/s, 0 = unlimited
+DEFAULT_ERROR_RATE = float(os.environ.get('LOCAL_SNOWFLAKE_ERROR_RATE', 0))
+DEFAULT_BATCH_SIZE = int(os.environ.get('LOCAL_SNOWFLAKE_BATCH_SIZE', 100000))
+
+DEFAULT_QUERY = """
+    SELECT state, art_form, tourist_visits, month, year, region, funding_received
+    FROM tourism_data
+"""
+
+
+# Exception hierarchy mirroring snowflake.connector.errors
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+# Connection over a SQLite file with injected latency, bandwidth limits and failures
+class SnowflakeConnection:
+    def __init__(self, path=None, connect_latency=None, query_latency=None, bandwidth=None,
+                 error_rate=None, batch_size=None, seed=None, **credentials):
+        self.path = path or DEFAULT_PATH
+        self.connect_latency = DEFAULT_CONNECT_LATENCY if connect_latency is None else connect_latency
+        self.query_latency = DEFAULT_QUERY_LATENCY if query_latency is None else query_latency
+        self.bandwidth = DEFAULT_BANDWIDTH if bandwidth is None else bandwidth
+        self.error_rate = DEFAULT_ERROR_RATE if error_rate is None else error_rate
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.credentials = credentials
+        self._random = random.Random(seed)
+
+        time.sleep(self.connect_latency)
+        self.inject_error("connect")
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+
+    # Raise an OperationalError with the configured probability
+    def inject_error(self, stage):
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise OperationalError(f"Injected failure during {stage}")
+
+    # Sleep as if nbytes had been transferred at the configured bandwidth
+    def throttle(self, nbytes):
+        if self.bandwidth:
+            time.sleep(nbytes / self.bandwidth)
+
+    def cursor(self):
+        if self._db is None:
+            raise ProgrammingError("Connection is closed")
+        return SnowflakeCursor(self)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SnowflakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection._db.cursor()
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, command, params=None):
+        time.sleep(self.connection.query_latency)
+        self.connection.inject_error("execute")
+        try:
+            self._cursor.execute(command, params or ())
+        except sqlite3.Error as e:
+            raise ProgrammingError(str(e)) from e
+        self.description = self._cursor.description
+        self.rowcount = self._cursor.rowcount
+        return self
+
+    # Snowflake returns unquoted identifiers in upper case
+    def columns(self):
+        if self.description is None:
+            raise ProgrammingError("No query has been executed")
+        return [column[0].upper() for column in self.description]
+
+    def fetch_rows(self, size):
+        rows = self._cursor.fetchmany(size)
+        if rows:
+            self.connection.throttle(sum(len(repr(row)) for row in rows))
+        return rows
+
+    def fetchone(self):
+        rows = self.fetch_rows(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self.fetch_rows(size or self.connection.batch_size)
+
+    def fetchall(self):
+        rows = []
+        while True:
+            batch = self.fetch_rows(self.connection.batch_size)
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def fetch_pandas_batches(self):
+        columns = self.columns()
+        while True:
+            batch = self.fetch_rows(self.connection.batch_size)
+            if not batch:
+                return
+            yield pd.DataFrame.from_records(batch, columns=columns)
+
+    def fetch_pandas_all(self):
+        columns = self.columns()
+        batches = list(self.fetch_pandas_batches())
+        if not batches:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(batches, ignore_index=True)
+
+    def close(self):
+        self._cursor.close()
+
+
+# Same entry point as snowflake.connector.connect
+def connect(**kwargs):
+    return SnowflakeConnection(**kwargs)
+
+
+# Function to load a DataFrame into a table of the local database
+def load_table(df, table, path=None, replace=True):
+    with sqlite3.connect(path or DEFAULT_PATH) as db:
+        df.to_sql(table, db, if_exists='replace' if replace else 'append', index=False, chunksize=100000)
+
+
+# Function to read a CSV or Parquet file (or a directory of Parquet files)
+def read_table_file(source):
+    if source.endswith('.csv'):
+        return pd.read_csv(source)
+    return pd.read_parquet(source)
+
+
+# Function to time connect / execute / first batch / full fetch for one run of a query
+def run_benchmark(query, streaming=False, **connect_kwargs):
+    timings = {}
+    started = time.perf_counter()
+    conn = connect(**connect_kwargs)
+    timings['connect'] = time.perf_counter() - started
+
+    cursor = conn.cursor()
+    cursor.execute(query)
+    timings['execute'] = time.perf_counter() - started - timings['connect']
+
+    rows = 0
+    if streaming:
+        for batch in cursor.fetch_pandas_batches():
+            if 'first_batch' not in timings:
+                timings['first_batch'] = time.perf_counter() - started
+            rows += len(batch)
+    else:
+        rows = len(cursor.fetch_pandas_all())
+
+    cursor.close()
+    conn.close()
+    timings['total'] = time.perf_counter() - started
+    timings['rows'] = rows
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Snowflake stand-in for offline testing")
+    parser.add_argument('--path', default=DEFAULT_PATH, help="SQLite database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('load', help="Load a CSV/Parquet file into a table")
+    load.add_argument('table')
+    load.add_argument('source')
+    load.add_argument('--append', action='store_true')
+
+    bench = commands.add_parser('bench', help="Time the warehouse query path")
+    bench.add_argument('--query', default=DEFAULT_QUERY)
+    bench.add_argument('--runs', type=int, default=3)
+    bench.add_argument('--streaming', action='store_true', help="Use fetch_pandas_batches")
+    bench.add_argument('--connect-latency', type=float, default=DEFAULT_CONNECT_LATENCY)
+    bench.add_argument('--query-latency', type=float, default=DEFAULT_QUERY_LATENCY)
+    bench.add_argument('--bandwidth', type=float, default=DEFAULT_BANDWIDTH)
+    bench.add_argument('--error-rate', type=float, default=DEFAULT_ERROR_RATE)
+    bench.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    bench.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == 'load':
+        df = read_table_file(args.source)
+        load_table(df, args.table, args.path, replace=not args.append)
+        print(f"Loaded {len(df):,} rows into {args.table}")
+        return
+
+    failures = 0
+    for run in range(args.runs):
+        try:
+            timings = run_benchmark(
+                args.query,
+                streaming=args.streaming,
+                path=args.path,
+                connect_latency=args.connect_latency,
+                query_latency=args.query_latency,
+                bandwidth=args.bandwidth,
+                error_rate=args.error_rate,
+                batch_size=args.batch_size,
+                seed=args.seed + run
+            )
+        except Error as e:
+            failures += 1
+            print(f"run {run + 1}: failed ({e})")
+            continue
+        summary = ", ".join(f"{name}={value:.3f}s" for name, value in timings.items() if name != 'rows')
+        print(f"run {run + 1}: {timings['rows']:,} rows, {summary}")
+
+    print(f"{args.runs - failures}/{args.runs} runs succeeded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Background refresh worker shared by all sessions of one server process.
+#
+# Every `interval` seconds the worker calls load_fn() for fresh data and,
+# when its fingerprint changed (or the most-used filter combinations did),
+# build_fn(data, fingerprint, popular_keys) to rebuild aggregates and
+# pre-warm caches. The finished snapshot replaces the previous one in a
+# single reference swap, so a rerun always sees one complete snapshot.
+
+import logging
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshWorker:
+    def __init__(self, load_fn, fingerprint_fn, build_fn, interval=3600, popular_count=5):
+        self.load_fn = load_fn
+        self.fingerprint_fn = fingerprint_fn
+        self.build_fn = build_fn
+        self.interval = interval
+        self.popular_count = popular_count
+
+        self._snapshot = None
+        # Set once the first refresh attempt has finished, whether or not it succeeded
+        self._attempted = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._usage = Counter()
+        self._usage_lock = threading.Lock()
+        self._thread = None
+        self.status = {'last_refresh': None, 'duration': None, 'error': None, 'refreshes': 0}
+
+    # Start the worker thread (daemon, so it never blocks server shutdown)
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name='refresh-worker', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # Ask for a refresh now instead of at the next scheduled time
+    def trigger(self):
+        self._wake.set()
+
+    # The latest complete snapshot, waiting up to timeout seconds for the first attempt
+    # (None when that attempt failed; status['error'] says why)
+    def current(self, timeout=None):
+        self._attempted.wait(timeout)
+        return self._snapshot
+
+    # Count a filter combination so the next refresh pre-warms the popular ones
+    def record_usage(self, key):
+        with self._usage_lock:
+            self._usage[key] += 1
+
+    # The most-used filter combinations, most used first
+    def popular_keys(self):
+        with self._usage_lock:
+            return [key for key, _ in self._usage.most_common(self.popular_count)]
+
+    # Load, rebuild and swap in a new snapshot; False when nothing changed
+    def refresh(self):
+        started = time.perf_counter()
+        data = self.load_fn()
+        fingerprint = self.fingerprint_fn(data)
+        popular = self.popular_keys()
+
+        previous = self._snapshot
+        if previous is not None and previous['fingerprint'] == fingerprint and previous['popular_keys'] == popular:
+            return False
+
+        snapshot = self.build_fn(data, fingerprint, popular)
+        snapshot.update({'fingerprint': fingerprint, 'popular_keys': popular, 'built_at': time.time()})
+
+        # Atomic swap: readers hold either the old or the new snapshot, never a partial one
+        self._snapshot = snapshot
+        self.status.update(last_refresh=time.time(), duration=time.perf_counter() - started,
+                           error=None, refreshes=self.status['refreshes'] + 1)
+        return True
+
+    # Refresh now, then every interval (or when triggered) until stopped
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception("Background refresh failed")
+                self.status['error'] = str(e)
+            self._attempted.set()
+            if self.interval <= 0:
+                return
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -0,0 +1,121 @@
+# Batched STL seasonal decomposition for many monthly series.
+#
+# decompose_series takes a (series x months) array and returns trend,
+# seasonal and residual components plus a multi-year peak-season estimate
+# for every series. Large batches are split across worker processes.
+
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from statsmodels.tsa.seasonal import STL
+
+PERIOD = 12
+PEAK_SEASON_MONTHS = 3
+MONTH_ABBREVIATIONS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Below this many series the process start-up costs more than it saves
+PARALLEL_MIN_SERIES = 64
+
+
+# Function to fill gaps so STL gets a complete series
+def fill_gaps(values):
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    if missing.all():
+        return np.zeros_like(values)
+    if missing.any():
+        positions = np.arange(len(values))
+        values = values.copy()
+        values[missing] = np.interp(positions[missing], positions[~missing], values[~missing])
+    return values
+
+
+# Function to decompose one batch of series (runs in a worker process)
+def decompose_batch(batch, period=PERIOD):
+    n_series, n_points = batch.shape
+    trend = np.full((n_series, n_points), np.nan)
+    seasonal = np.full((n_series, n_points), np.nan)
+    resid = np.full((n_series, n_points), np.nan)
+
+    # STL needs at least two full periods
+    if n_points < 2 * period:
+        return trend, seasonal, resid
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for i, values in enumerate(batch):
+            result = STL(fill_gaps(values), period=period, robust=True).fit()
+            trend[i], seasonal[i], resid[i] = result.trend, result.seasonal, result.resid
+
+    return trend, seasonal, resid
+
+
+# Function to summarise the seasonal component into a stable peak month and peak season
+def peak_seasons(seasonal, resid, first_month=1, period=PERIOD, season_months=PEAK_SEASON_MONTHS):
+    n_series, n_points = seasonal.shape
+    calendar_month = (np.arange(n_points) + first_month - 1) % period
+
+    # Average seasonal effect per calendar month across all years
+    profile = np.full((n_series, period), np.nan)
+    for month in range(period):
+        columns = seasonal[:, calendar_month == month]
+        if columns.shape[1]:
+            profile[:, month] = columns.mean(axis=1)
+
+    # Best window of consecutive months (wrapping around the year end)
+    windows = sum(np.roll(profile, -offset, axis=1) for offset in range(season_months))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        valid = ~np.isnan(profile).all(axis=1)
+        peak_month = np.where(valid, np.nanargmax(np.where(valid[:, None], profile, 0), axis=1), -1)
+        season_start = np.where(valid, np.nanargmax(np.where(valid[:, None], windows, 0), axis=1), -1)
+
+        # Strength of seasonality: 1 - Var(R) / Var(S + R)
+        strength = 1 - np.nanvar(resid, axis=1) / np.nanvar(seasonal + resid, axis=1)
+
+    season_labels = [
+        '–'.join([MONTH_ABBREVIATIONS[start], MONTH_ABBREVIATIONS[(start + season_months - 1) % period]])
+        if start >= 0 else ''
+        for start in season_start
+    ]
+
+    return {
+        'profile': profile,
+        'peak_month': peak_month + 1,
+        'peak_season': season_labels,
+        'strength': np.clip(strength, 0, 1)
+    }
+
+
+# Function to count the CPUs this process may run on
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Function to decompose every row of a (series x months) array, in parallel for large batches
+def decompose_series(values, first_month=1, period=PERIOD, workers=None):
+    values = np.asarray(values, dtype=float)
+    workers = workers or available_cpus()
+
+    if len(values) < PARALLEL_MIN_SERIES or workers == 1:
+        trend, seasonal, resid = decompose_batch(values, period)
+    else:
+        batches = np.array_split(values, min(workers * 4, len(values)))
+        # Spawned workers avoid forking a multi-threaded server process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(decompose_batch, batches, [period] * len(batches)))
+        trend, seasonal, resid = (np.concatenate(parts) for parts in zip(*results))
+
+    return {
+        'trend': trend,
+        'seasonal': seasonal,
+        'resid': resid,
+        **peak_seasons(seasonal, resid, first_month, period)
+    }
@@ -0,0 +1,129 @@
+# Single-pass summaries for KPI cards and leaderboards.
+#
+# A dimension (state, art form, site, ...) is dictionary-encoded once; one
+# bincount per measure then gives every member's sums, the grand totals and
+# the exact distinct count together, and the top-K members come from a
+# partial sort (argpartition) instead of sorting the whole table.
+#
+#     summary = summarize(df['state'], {'tourist_visits': df['tourist_visits']}, k=10)
+#     summary['totals'], summary['distinct'], summary['top']
+#
+# For very high-cardinality keys, or counts merged across partitions,
+# HyperLogLog gives an approximate distinct count in fixed memory.
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 10
+
+# HyperLogLog registers = 2 ** precision (14 -> 16 KB, ~0.8% standard error)
+DEFAULT_PRECISION = 14
+
+
+# Function to dictionary-encode a key column (categoricals reuse their codes)
+def dictionary_encode(keys):
+    if isinstance(keys, pd.Series) and isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories.to_numpy()
+    codes, members = pd.factorize(np.asarray(keys))
+    return codes, np.asarray(members)
+
+
+# Function to get the positions of the k largest scores, largest first
+def top_k(scores, k=DEFAULT_K):
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+# Function to summarise member sums into totals, distinct count and top-k
+def summarize_sums(sums, counts, members, dimension, k=DEFAULT_K, rank_by=None):
+    rank_by = rank_by or next(iter(sums))
+    present = np.flatnonzero(counts > 0)
+    top = present[top_k(sums[rank_by][present], k)]
+    return {
+        'totals': {name: values[present].sum() for name, values in sums.items()},
+        'distinct': len(present),
+        'top': pd.DataFrame({dimension: members[top], **{name: values[top] for name, values in sums.items()}})
+    }
+
+
+# Function to summarise dictionary codes and their measures in one pass
+def summarize_codes(codes, members, measures, dimension='key', k=DEFAULT_K, rank_by=None):
+    valid = codes >= 0
+    codes = codes[valid]
+    counts = np.bincount(codes, minlength=len(members))
+    sums = {
+        name: np.bincount(codes, weights=np.asarray(values)[valid], minlength=len(members))
+        for name, values in measures.items()
+    }
+    return summarize_sums(sums, counts, members, dimension, k, rank_by)
+
+
+# Function to summarise a key column and its measures (sums, totals, distinct count, top-k)
+def summarize(keys, measures, k=DEFAULT_K, rank_by=None):
+    codes, members = dictionary_encode(keys)
+    dimension = getattr(keys, 'name', None) or 'key'
+    return summarize_codes(codes, members, measures, dimension, k, rank_by)
+
+
+# Function to summarise pre-aggregated (member x measure) totals, e.g. from the filter cube
+def summarize_totals(totals, members, measure_names, dimension, k=DEFAULT_K, rank_by=None, count_measure='rows'):
+    sums = {name: totals[:, i] for i, name in enumerate(measure_names) if name != count_measure}
+    return summarize_sums(sums, totals[:, measure_names.index(count_measure)], members, dimension, k, rank_by)
+
+
+# Function to count distinct keys, exactly from dictionary codes or approximately with HyperLogLog
+def count_distinct(keys, approximate=False, precision=DEFAULT_PRECISION):
+    if approximate:
+        sketch = HyperLogLog(precision)
+        sketch.add(keys)
+        return sketch.count()
+    codes, members = dictionary_encode(keys)
+    return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(members))))
+
+
+# Function to get the bit length of each uint64 value
+def bit_length(values):
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp is exact on 32-bit halves: x = m * 2**e with 0.5 <= m < 1, so e is the bit length
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+# HyperLogLog distinct-count sketch; sketches with the same precision can be merged
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    # Add values (any hashable column) to the sketch
+    def add(self, values):
+        hashes = pd.util.hash_array(np.asarray(values))
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # Remaining bits with a sentinel so the rank is bounded by 64 - precision + 1
+        remaining = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rank = (65 - bit_length(remaining)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    # Fold another sketch into this one (the union of both inputs)
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    # Estimated number of distinct values added
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
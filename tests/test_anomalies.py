@@ -0,0 +1,35 @@
+import numpy as np
+from scipy import stats
+
+from anomalies import score_series
+
+THRESHOLD = 3.5
+
+
+def lognormal_noise(n_series, seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    values = np.log1p(rng.lognormal(mean=9, sigma=0.3, size=(n_series, 5, 12)))
+    values[rng.random(values.shape) < missing] = np.nan
+    return values
+
+
+def test_flag_rate_on_pure_noise_is_near_nominal():
+    scores, _ = score_series(lognormal_noise(4000))
+    nominal = 2 * stats.norm.sf(THRESHOLD)
+    rate = np.mean(np.abs(scores) > THRESHOLD)
+    assert nominal / 3 < rate < 2 * nominal
+
+
+def test_flag_rate_with_missing_months_stays_below_nominal_bound():
+    values = lognormal_noise(4000, seed=1, missing=0.2)
+    scores, _ = score_series(values)
+    assert np.nanmean(np.abs(scores) > THRESHOLD) < 2 * 2 * stats.norm.sf(THRESHOLD)
+    assert not np.isnan(scores[~np.isnan(values)]).any()
+
+
+def test_spike_is_flagged():
+    values = lognormal_noise(200, seed=2)
+    values[:, 2, 5] += 3.0
+    scores, fitted = score_series(values)
+    assert np.mean(scores[:, 2, 5] > THRESHOLD) > 0.95
+    assert np.all(fitted[:, 2, 5] < values[:, 2, 5])
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked_aggregation import GRAIN, MEASURES, aggregate_chunks, iter_budget_chunks
+
+
+def fact_table(n_rows, n_states=10, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'year': rng.integers(2019, 2024, n_rows),
+        'month': rng.integers(1, 13, n_rows),
+        'region': 'North',
+        'state': rng.integers(0, n_states, n_rows).astype(str),
+        'art_form': rng.integers(0, 5, n_rows).astype(str),
+        'tourist_visits': rng.integers(0, 1000, n_rows),
+        'funding_received': rng.integers(0, 1000, n_rows)
+    })
+
+
+def chunks(df, rows):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows].copy()
+
+
+def test_matches_single_group_by():
+    df = fact_table(50000)
+    result = aggregate_chunks(chunks(df, 1000), budget_bytes=4 * 1024 * 1024)
+    expected = df.groupby(GRAIN)[MEASURES].sum().reset_index()
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_compaction_is_not_repeated_for_every_chunk():
+    df = fact_table(200000, n_states=200)
+    stats = {}
+    aggregate_chunks(chunks(df, 1000), budget_bytes=8 * 1024 * 1024, stats=stats)
+    assert stats['chunks'] == 200
+    assert stats['compactions'] < 20
+
+
+def test_result_larger_than_budget_fails_loudly():
+    df = fact_table(200000, n_states=5000)
+    with pytest.raises(MemoryError):
+        aggregate_chunks(chunks(df, 1000), budget_bytes=1024 * 1024)
+
+
+def test_source_batches_are_resliced_to_the_budget():
+    df = fact_table(50000)
+    batches = [df.iloc[:30000], df.iloc[30000:30500], df.iloc[30500:]]
+    pieces = list(iter_budget_chunks(batches, budget_bytes=256 * 1024))
+    chunk_rows = len(pieces[0])
+    assert chunk_rows < 30000
+    assert all(len(piece) == chunk_rows for piece in pieces[:-1])
+    pd.testing.assert_frame_equal(pd.concat(pieces, ignore_index=True), df.reset_index(drop=True))
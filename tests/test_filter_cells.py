@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from filter_cells import build_cube, filter_rows, maintain_filter_aggregates, selected_filter_cells
+
+REGIONS = ['East', 'North', 'South', 'West']
+
+
+def fact_table(n_rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    state = rng.integers(0, 12, n_rows)
+    return pd.DataFrame({
+        'year': rng.integers(2020, 2025, n_rows),
+        'month': rng.integers(1, 13, n_rows),
+        'region': np.array(REGIONS)[state % len(REGIONS)],
+        'state': np.char.add('State ', state.astype(str)),
+        'art_form': np.char.add('Art ', rng.integers(0, 20, n_rows).astype(str)),
+        'tourist_visits': rng.integers(0, 10000, n_rows),
+        'funding_received': rng.integers(0, 50000, n_rows),
+        'latitude': state * 1.0,
+        'longitude': state * 2.0
+    })
+
+
+def expected_totals(df, cube, year, regions, months, dimension, members):
+    selected = df[(df['year'] == year) & df['region'].isin(regions) & df['month'].isin(months)]
+    grouped = selected.groupby(dimension).agg(tourist_visits=('tourist_visits', 'sum'),
+                                              funding_received=('funding_received', 'sum'),
+                                              rows=('tourist_visits', 'size'))
+    return grouped.reindex(members, fill_value=0).to_numpy()
+
+
+def test_incremental_updates_match_a_fresh_group_by():
+    df = fact_table()
+    cube = build_cube(df)
+    store = {}
+    selections = [
+        (2024, REGIONS, list(range(1, 13))),
+        (2024, REGIONS, list(range(1, 12))),             # drop a month
+        (2024, REGIONS, [1, 2, 3, 11]),                 # drop several months
+        (2024, ['East', 'South', 'West'], [1, 2, 3, 11]),  # drop a region
+        (2024, ['East', 'South', 'West'], [1, 2, 3, 4, 11]),  # add a month back
+        (2024, REGIONS, [1, 2, 3, 4, 11]),              # add the region back
+        (2021, ['North'], [6]),                          # switch year
+        (2021, ['North', 'West'], [6, 7]),
+    ]
+    for year, regions, months in selections:
+        cells = selected_filter_cells(cube, year, regions, months)
+        aggregates = maintain_filter_aggregates(cube, 'fp', cells, store)
+        np.testing.assert_array_equal(
+            aggregates['state_totals'], expected_totals(df, cube, year, regions, months, 'state', cube['states']))
+        np.testing.assert_array_equal(
+            aggregates['art_form_totals'],
+            expected_totals(df, cube, year, regions, months, 'art_form', cube['art_forms']))
+
+
+def test_new_fingerprint_rebuilds_from_scratch():
+    df = fact_table()
+    cube = build_cube(df)
+    cells = selected_filter_cells(cube, 2024, REGIONS, [1, 2])
+    store = {'filter_aggregates': {'fingerprint': 'old', 'cells': cells,
+                                   'state_totals': np.zeros_like(cube['state_cells'][0]),
+                                   'art_form_totals': np.zeros_like(cube['art_form_cells'][0])}}
+    aggregates = maintain_filter_aggregates(cube, 'new', cells, store)
+    np.testing.assert_array_equal(
+        aggregates['state_totals'], expected_totals(df, cube, 2024, REGIONS, [1, 2], 'state', cube['states']))
+
+
+def test_filter_rows_slices_the_selection_and_one_state():
+    df = fact_table()
+    cube = build_cube(df)
+    cells = selected_filter_cells(cube, 2023, ['North', 'South'], [3, 4, 5])
+    selected = df[(df['year'] == 2023) & df['region'].isin(['North', 'South']) & df['month'].isin([3, 4, 5])]
+
+    pd.testing.assert_frame_equal(filter_rows(df, cube, cells), selected)
+    pd.testing.assert_frame_equal(filter_rows(df, cube, cells, 'State 1'), selected[selected['state'] == 'State 1'])
+    assert filter_rows(df, cube, cells, 'Nowhere').empty
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from generate_dataset import STATE_POPULARITY, STATE_REGIONS, STATES, generate_block, partition_sizes
+from tourism_model import SEASONAL_MULTIPLIERS, YEARLY_GROWTH
+
+# Rows per (year, month) partition when generating the 100M-row dataset
+PARTITION_ROWS = partition_sizes(100_000_000, [(year, month) for year in YEARLY_GROWTH for month in range(1, 13)])[0]
+
+
+@pytest.mark.parametrize('year,month', [(2020, 6), (2024, 1)])
+def test_partition_state_totals_keep_mock_magnitude_at_100m_rows(year, month):
+    rng = np.random.default_rng([0, year, month])
+    block = generate_block(rng, year, month, PARTITION_ROWS, PARTITION_ROWS / len(STATES)).to_pandas()
+    totals = block.groupby('state', observed=True)[['tourist_visits', 'funding_received']].sum().reindex(STATES)
+
+    # generate_mock_data: gamma(10, popularity * 10000) * season * growth visits, funding 1.25x visits on average
+    seasonal = np.array([SEASONAL_MULTIPLIERS.get(region, [1.0] * 12)[month - 1] for region in STATE_REGIONS])
+    expected_visits = 10 * STATE_POPULARITY * 10000 * seasonal * YEARLY_GROWTH.get(year, 1.0)
+
+    np.testing.assert_allclose(totals['tourist_visits'], expected_visits, rtol=0.03)
+    np.testing.assert_allclose(totals['funding_received'], 1.25 * expected_visits, rtol=0.03)
@@ -0,0 +1,34 @@
+import time
+
+from refresh_worker import RefreshWorker
+
+
+def failing_load():
+    raise RuntimeError("warehouse unavailable")
+
+
+def build_snapshot(data, fingerprint, popular_keys):
+    return {'data': data}
+
+
+def test_current_returns_promptly_after_failed_first_refresh():
+    worker = RefreshWorker(failing_load, len, build_snapshot, interval=3600).start()
+    try:
+        started = time.perf_counter()
+        assert worker.current(timeout=5) is None
+        assert worker.current(timeout=5) is None
+        assert time.perf_counter() - started < 1
+        assert worker.status['error'] == "warehouse unavailable"
+    finally:
+        worker.stop()
+
+
+def test_current_returns_snapshot_after_successful_refresh():
+    worker = RefreshWorker(lambda: [1, 2, 3], len, build_snapshot, interval=3600).start()
+    try:
+        snapshot = worker.current(timeout=5)
+        assert snapshot['data'] == [1, 2, 3]
+        assert snapshot['fingerprint'] == 3
+        assert worker.status['error'] is None
+    finally:
+        worker.stop()
@@ -0,0 +1,111 @@
+# Tourism model behind the mock and synthetic datasets: states, regions, art
+# forms, seasonal multipliers by region, year-on-year growth and state
+# popularity. Shared by app.generate_mock_data and generate_dataset.py so the
+# two produce data with the same shape.
+
+# Indian states and union territories
+STATES = [
+    'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh',
+    'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand', 'Karnataka',
+    'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya', 'Mizoram',
+    'Nagaland', 'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana',
+    'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal', 'Delhi', 'Jammu and Kashmir'
+]
+
+# Define regions for each state
+REGIONS = {
+    'North': ['Delhi', 'Haryana', 'Himachal Pradesh', 'Jammu and Kashmir', 'Punjab', 'Rajasthan', 'Uttar Pradesh', 'Uttarakhand'],
+    'South': ['Andhra Pradesh', 'Karnataka', 'Kerala', 'Tamil Nadu', 'Telangana'],
+    'East': ['Bihar', 'Jharkhand', 'Odisha', 'West Bengal'],
+    'West': ['Goa', 'Gujarat', 'Maharashtra'],
+    'Central': ['Chhattisgarh', 'Madhya Pradesh'],
+    'Northeast': ['Arunachal Pradesh', 'Assam', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Sikkim', 'Tripura']
+}
+
+# Map states to their regions
+STATE_TO_REGION = {state: region for region, region_states in REGIONS.items() for state in region_states}
+
+# Traditional art forms by state
+ART_FORMS = {
+    'Andhra Pradesh': ['Kuchipudi', 'Kalamkari', 'Budithi Brass Craft'],
+    'Arunachal Pradesh': ['Monpa Mask', 'Thangka Paintings', 'Wancho Wood Carving'],
+    'Assam': ['Bihu Dance', 'Sattriya Dance', 'Assam Silk Weaving'],
+    'Bihar': ['Madhubani Painting', 'Manjusha Art', 'Sujni Embroidery'],
+    'Chhattisgarh': ['Panthi Dance', 'Godna Art', 'Bell Metal Craft'],
+    'Goa': ['Dekni Dance', 'Fugdi Dance', 'Goan Lacework'],
+    'Gujarat': ['Garba', 'Patola Weaving', 'Rogan Art'],
+    'Haryana': ['Phag Dance', 'Embroidery Craft', 'Charpai Weaving'],
+    'Himachal Pradesh': ['Kullu Shawl Weaving', 'Chamba Rumal', 'Kangra Painting'],
+    'Jharkhand': ['Sohrai Painting', 'Chhau Dance', 'Dokra Metal Craft'],
+    'Karnataka': ['Yakshagana', 'Bidri Ware', 'Mysore Painting'],
+    'Kerala': ['Kathakali', 'Mohiniyattam', 'Aranmula Kannadi'],
+    'Madhya Pradesh': ['Gond Art', 'Bagh Print', 'Chanderi Weaving'],
+    'Maharashtra': ['Lavani Dance', 'Warli Painting', 'Paithani Sarees'],
+    'Manipur': ['Manipuri Dance', 'Longpi Pottery', 'Phanek Weaving'],
+    'Meghalaya': ['Nongkrem Dance', 'Bamboo Craft', 'Garo Wangala Dance'],
+    'Mizoram': ['Cheraw Dance', 'Mizo Bamboo Dance', 'Puanchei Textiles'],
+    'Nagaland': ['Hornbill Festival Dances', 'Naga Shawl Weaving', 'Wood Carving'],
+    'Odisha': ['Odissi Dance', 'Pattachitra', 'Applique Work'],
+    'Punjab': ['Bhangra', 'Phulkari Embroidery', 'Jutti Making'],
+    'Rajasthan': ['Ghoomar Dance', 'Blue Pottery', 'Miniature Painting'],
+    'Sikkim': ['Mask Dance', 'Thangka Painting', 'Carpet Weaving'],
+    'Tamil Nadu': ['Bharatanatyam', 'Tanjore Painting', 'Stone Carving'],
+    'Telangana': ['Perini Shivatandavam', 'Nirmal Paintings', 'Bidri Craft'],
+    'Tripura': ['Hojagiri Dance', 'Bamboo Craft', 'Risa Textile Weaving'],
+    'Uttar Pradesh': ['Kathak Dance', 'Chikankari', 'Lucknow Zardozi'],
+    'Uttarakhand': ['Choliya Dance', 'Aipan Art', 'Ringal Craft'],
+    'West Bengal': ['Durga Puja Art', 'Kantha Stitch', 'Patachitra'],
+    'Delhi': ['Kathak Dance', 'Zardozi Work', 'Meenakari Craft'],
+    'Jammu and Kashmir': ['Rauf Dance', 'Pashmina Weaving', 'Walnut Wood Carving']
+}
+
+# Seasonal trends - higher tourism in different regions based on season
+# Higher tourism in North and Central during winter (Nov-Feb)
+# Higher tourism in Himalayan regions during summer (Apr-Jul)
+# Higher tourism in South and East during monsoon (Jul-Oct)
+SEASONAL_MULTIPLIERS = {
+    'North': [0.8, 0.7, 0.9, 1.0, 1.1, 1.2, 0.7, 0.6, 0.8, 1.0, 1.5, 1.7],
+    'South': [1.3, 1.2, 1.0, 0.8, 0.7, 0.6, 0.8, 1.0, 1.2, 1.4, 1.3, 1.5],
+    'East': [1.2, 1.0, 0.9, 0.8, 0.7, 0.6, 0.9, 1.1, 1.3, 1.4, 1.2, 1.3],
+    'West': [1.1, 1.0, 0.9, 0.7, 0.6, 0.5, 0.8, 1.2, 1.4, 1.3, 1.2, 1.3],
+    'Central': [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.5],
+    'Northeast': [0.6, 0.7, 0.9, 1.1, 1.3, 1.4, 0.9, 0.7, 0.8, 1.0, 0.8, 0.7]
+}
+
+# Year-on-year growth trend (tourism recovery after COVID)
+YEARLY_GROWTH = {
+    2020: 0.4,  # COVID impact
+    2021: 0.6,  # Partial recovery
+    2022: 0.8,  # Further recovery
+    2023: 0.9,  # Almost back to normal
+    2024: 1.1   # Beyond pre-COVID levels
+}
+
+# Base popularity factors for states (larger states/popular tourist destinations have higher base visitors)
+POPULARITY_FACTOR = {
+    'Rajasthan': 1.8, 'Kerala': 1.7, 'Goa': 1.6, 'Tamil Nadu': 1.7, 'Uttar Pradesh': 1.7,
+    'Maharashtra': 1.6, 'Delhi': 1.6, 'Gujarat': 1.4, 'Karnataka': 1.5, 'Himachal Pradesh': 1.4,
+    'Uttarakhand': 1.4, 'Jammu and Kashmir': 1.3, 'West Bengal': 1.4, 'Madhya Pradesh': 1.3,
+    'Odisha': 1.2, 'Andhra Pradesh': 1.2, 'Telangana': 1.2, 'Assam': 1.1, 'Punjab': 1.1,
+    'Bihar': 0.9, 'Chhattisgarh': 0.9, 'Jharkhand': 0.8, 'Manipur': 0.8, 'Meghalaya': 0.9,
+    'Tripura': 0.8, 'Nagaland': 0.8, 'Mizoram': 0.7, 'Sikkim': 1.0, 'Arunachal Pradesh': 0.9,
+    'Haryana': 0.9
+}
+
+# Kind of each art form, matched by keyword (first match wins; anything else is a craft)
+ART_FORM_KINDS = [
+    ('Performing Arts', ['dance', 'garba', 'bhangra', 'kathakali', 'kuchipudi', 'bharatanatyam', 'mohiniyattam',
+                         'yakshagana', 'shivatandavam']),
+    ('Textiles', ['weaving', 'silk', 'embroidery', 'stitch', 'chikankari', 'zardozi', 'lacework', 'rumal',
+                  'sarees', 'textile', 'kalamkari', 'applique', 'print']),
+    ('Painting', ['painting', 'art', 'chitra', 'thangka'])
+]
+
+
+# Function to classify an art form into its kind
+def art_form_kind(art_form):
+    name = art_form.lower()
+    for kind, keywords in ART_FORM_KINDS:
+        if any(keyword in name for keyword in keywords):
+            return kind
+    return 'Crafts'